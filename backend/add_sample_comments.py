@@ -14,9 +14,11 @@ load_dotenv()
 # Add the backend directory to the path
 sys.path.append(os.path.dirname(__file__))
 
-from app import app
+from app import create_app
 from app.models import db, User, Idea, Comment
 
+app = create_app()
+
 def add_sample_comments():
     """Add sample comments to existing ideas."""
     
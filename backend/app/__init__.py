@@ -2,45 +2,96 @@ from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
-from supabase import create_client
-import warnings
 import sys
 from flask_migrate import Migrate
 from app.models import db
+from app.db_pool import init_db
+from app.replica import init_replica
+from app.versions import collection_versions
+from app.compression import init_compression
+from app.query_stats import init_query_stats
+from app.metrics import init_metrics
+from app.like_buffer import like_buffer
+from app.sessions import init_sessions
+from app.serialization import init_json
+from app.auth_tokens import TokenVerifier
+from app.supabase_client import LazySupabase
+from app.health import ReadinessMonitor
+from app.commands import register_commands
+from app.index_audit import run_startup_audit
 # Add the backend directory to the path for config import
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from config import Config
 
 # load backend/.env
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
+from config import config
+
 def _env(name, default=""):
     v = os.getenv(name, default)
     return v.strip() if isinstance(v, str) else v
 
-SUPABASE_URL = _env("SUPABASE_URL")
-SUPABASE_ANON_KEY = _env("SUPABASE_ANON_KEY")
-FLASK_SECRET_KEY = _env("FLASK_SECRET_KEY") or "change-me"
-
-app = Flask(__name__)
-app.secret_key = FLASK_SECRET_KEY
-app.config.from_object(Config)
-
-# Enable CORS for all domains and routes
-CORS(app)
-
-db.init_app(app)
-migrate = Migrate(app, db)
-# create a Supabase client if keys available, otherwise keep None (fail later with clear message)
-if SUPABASE_URL and SUPABASE_ANON_KEY and not SUPABASE_URL.startswith("your_") and not SUPABASE_ANON_KEY.startswith("your_"):
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-    except Exception as e:
-        warnings.warn(f"Failed to create Supabase client: {e}", RuntimeWarning)
-        supabase = None
-else:
-    warnings.warn("SUPABASE_URL or SUPABASE_ANON_KEY missing or using placeholder values in backend/.env — supabase client not created", RuntimeWarning)
-    supabase = None
-
-# Import routes after app creation to avoid circular imports
-from app import routes
\ No newline at end of file
+def create_app(profile=None):
+    """Create the Flask app for a config profile from config_extended.py.
+
+    ``profile`` is ``development``, ``production`` or ``testing``; it
+    defaults to ``FLASK_ENV`` and then to ``development``. A ``FLASK_ENV``
+    with no matching profile (e.g. ``staging``) falls back to the default
+    with a warning. Each call builds its own caches, session backend and
+    clients, but the like buffer and collection versions are module-level
+    and bound to the most recently created app.
+    """
+    env_profile = _env("FLASK_ENV")
+    unknown_env = not profile and env_profile and env_profile not in config
+    if unknown_env:
+        profile = "default"
+    profile = profile or env_profile or "default"
+    if profile not in config:
+        raise ValueError(f"Unknown config profile: {profile!r}")
+
+    app = Flask(__name__)
+    app.config.from_object(config[profile])
+    app.config["PROFILE"] = profile
+    if unknown_env:
+        app.logger.warning(f"No config profile for FLASK_ENV={env_profile!r}; using the default profile")
+    init_sessions(app)
+    init_json(app)
+
+    # Enable CORS for all domains and routes
+    CORS(app)
+
+    init_db(app, db)
+    init_replica(app, db)
+    Migrate(app, db)
+    like_buffer.init_app(app, db)
+    collection_versions.init_app(app, db)
+    # Registered first so its after_request runs last and times the whole response
+    init_metrics(app, db)
+    init_compression(app)
+    init_query_stats(app)
+    register_commands(app)
+    run_startup_audit(app)
+
+    supabase_url = _env("SUPABASE_URL")
+    jwt_secret = _env("SUPABASE_JWT_SECRET")
+    # Built on first auth use so workers serving only reads never import supabase
+    app.extensions["supabase"] = LazySupabase(supabase_url, _env("SUPABASE_ANON_KEY"))
+    # Verifies Supabase access tokens locally (JWT secret / JWKS), falling back to the auth API
+    app.extensions["token_verifier"] = TokenVerifier(
+        supabase_url,
+        jwt_secret=None if jwt_secret.startswith("your_") else jwt_secret,
+        cache_size=app.config.get("AUTH_TOKEN_CACHE_SIZE", 10000),
+        cache_ttl=app.config.get("AUTH_TOKEN_CACHE_TTL", 3600)
+    )
+    # Deep checks for /health/ready, run in the background so probes never hit the database
+    app.extensions["readiness"] = ReadinessMonitor(
+        app, db,
+        interval=app.config.get("HEALTH_CHECK_INTERVAL", 10),
+        pool_saturation=app.config.get("HEALTH_POOL_SATURATION", 0.9),
+        supabase_timeout=app.config.get("HEALTH_SUPABASE_TIMEOUT", 2)
+    )
+
+    # Import routes here to avoid circular imports
+    from app import routes
+    routes.init_app(app)
+    return app
@@ -0,0 +1,107 @@
+"""Local verification of Supabase access tokens.
+
+Supabase access tokens are JWTs. Instead of calling ``auth.get_user`` over
+the network on every OAuth token exchange, ``TokenVerifier`` checks the
+signature locally with PyJWT:
+
+- HS256 tokens against ``SUPABASE_JWT_SECRET`` (the project's JWT secret);
+- RS256/ES256 tokens against the project's JWKS, fetched once and cached.
+  This needs the ``cryptography`` package that PyJWT uses for asymmetric keys.
+
+Verified users are cached by token hash until the token expires (bounded
+by ``AUTH_TOKEN_CACHE_TTL``), so repeat exchanges of the same token cost
+nothing. When a token cannot be checked locally (no secret configured,
+JWKS unreachable), the verifier falls back to ``supabase.auth.get_user``
+and caches that answer the same way.
+"""
+import hashlib
+import time
+
+import jwt
+
+from app.cache import TTLCache
+
+
+class TokenVerifier:
+    """Resolve Supabase access tokens to user dicts, locally where possible."""
+
+    def __init__(self, supabase_url, jwt_secret=None, audience='authenticated',
+                 cache_size=10000, cache_ttl=3600, jwks_ttl=600):
+        self.jwt_secret = jwt_secret or None
+        self.audience = audience
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.jwks_url = f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json" if supabase_url else None
+        self.jwks_ttl = jwks_ttl
+        self._jwks_client = None
+
+    @staticmethod
+    def _cache_key(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _signing_key(self, token, alg):
+        """Return the key to verify ``token`` with, or None if it can't be checked locally."""
+        if alg == 'HS256':
+            return self.jwt_secret
+        if self.jwks_url is None:
+            return None
+        if self._jwks_client is None:
+            self._jwks_client = jwt.PyJWKClient(self.jwks_url, cache_keys=True, lifespan=self.jwks_ttl)
+        try:
+            return self._jwks_client.get_signing_key_from_jwt(token).key
+        except (jwt.PyJWKClientError, jwt.exceptions.PyJWKError):
+            return None
+
+    def verify_locally(self, token):
+        """Return the token's claims, or None if it can't be checked locally.
+
+        Raises ``jwt.InvalidTokenError`` for tokens that are expired, forged
+        or issued for another audience.
+        """
+        header = jwt.get_unverified_header(token)
+        alg = header.get('alg')
+        if alg not in ('HS256', 'RS256', 'ES256'):
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {alg}")
+        key = self._signing_key(token, alg)
+        if key is None:
+            return None
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[alg],
+            audience=self.audience,
+            options={'require': ['exp', 'sub']}
+        )
+
+    def get_user(self, token, fetch_remote):
+        """Return the user for ``token`` as a dict, or None if the token is invalid.
+
+        ``fetch_remote(token)`` is called only when the token can't be
+        verified locally; it must return a user dict or None.
+        """
+        key = self._cache_key(token)
+        user = self.cache.get(key)
+        if user is not None:
+            return user
+
+        try:
+            claims = self.verify_locally(token)
+        except jwt.InvalidTokenError:
+            return None
+
+        if claims is not None:
+            user = {
+                'id': claims['sub'],
+                'email': claims.get('email'),
+                'user_metadata': claims.get('user_metadata') or {},
+                'app_metadata': claims.get('app_metadata') or {},
+            }
+            expires_in = claims['exp'] - time.time()
+        else:
+            user = fetch_remote(token)
+            if not user:
+                return None
+            exp = jwt.decode(token, options={'verify_signature': False}).get('exp')
+            expires_in = exp - time.time() if exp else None
+
+        self.cache.set(key, user, ttl=expires_in)
+        return user
@@ -0,0 +1,224 @@
+"""Caches for hot, rarely-changing API responses.
+
+``CachedPayload`` and ``TTLCache`` live in each gunicorn worker. Writes
+handled by a worker invalidate that worker's copy immediately; the other
+workers pick up the change when their TTL expires. ``VersionedCache``
+adds an optional shared level and is invalidated by collection versions
+instead (see app/versions.py).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+
+class CachedPayload:
+    """A JSON response body built on demand and kept for ``ttl`` seconds.
+
+    ``builder`` returns a JSON-serializable object. It is serialized once per
+    refresh, so cache hits only hand out the stored bytes and their ETag.
+    The built object is kept too (``get_data``) for callers that need to
+    personalise it; they must copy rather than mutate it.
+    """
+
+    def __init__(self, builder, ttl=60):
+        self.builder = builder
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (data, body, etag, expires_at), swapped as a whole so readers never see a mix
+        self._entry = None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _current(self):
+        entry = self._entry
+        if entry is not None and time.monotonic() < entry[3]:
+            self.hits += 1  # approximate under threads; only feeds metrics
+            return entry
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            entry = self._entry
+            if entry is not None and time.monotonic() < entry[3]:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self._generation
+            data = self.builder()
+            body = current_app.json.dumps_bytes(data)
+            entry = (data, body, hashlib.sha1(body).hexdigest(), time.monotonic() + self.ttl)
+            # Don't keep a payload that was invalidated while it was being built
+            if generation == self._generation:
+                self._entry = entry
+            return entry
+
+    def get(self):
+        """Return ``(body, etag)``, rebuilding the payload if it is stale."""
+        _, body, etag, _ = self._current()
+        return body, etag
+
+    def get_data(self):
+        """Return the built (unserialized) payload, rebuilding it if it is stale."""
+        return self._current()[0]
+
+    def invalidate(self):
+        """Drop the cached payload so the next request rebuilds it."""
+        self._generation += 1
+        self._entry = None
+
+    def response(self):
+        """Build a conditional JSON response for the current request.
+
+        Clients and CDNs are told to revalidate on every use (``no-cache``);
+        a matching ``If-None-Match`` is answered with 304 from memory.
+        """
+        body, etag = self.get()
+        response = current_app.response_class(body, status=200, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+
+class TTLCache:
+    """A small thread-safe LRU mapping whose entries expire after ``ttl`` seconds.
+
+    Holds at most ``maxsize`` entries; the least recently used one is
+    evicted first. A ``ttl`` of 0 disables the cache (every ``get`` misses).
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if self.ttl <= 0:
+            return default
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            if time.monotonic() >= item[0]:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, ttl=None):
+        """Store ``value``; ``ttl`` overrides the cache-wide lifetime, capped at it."""
+        if self.ttl <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class VersionedCache:
+    """Two-level cache of JSON-ready results, keyed by collection version.
+
+    Entries live in a per-worker ``TTLCache`` and, when a Redis-protocol
+    ``shared`` client is given, in a store shared by all workers. Keys embed
+    the collection version, so a write makes every older entry unreachable
+    and no explicit invalidation is needed. Values go through a JSON
+    round-trip on build, so a hit from either level looks the same
+    (ids and timestamps as strings). Callers must copy before mutating.
+    With the local TTL at 0 and no shared store, every call just builds.
+    """
+
+    def __init__(self, local, shared=None, prefix='cache:', shared_ttl=300):
+        self.local = local
+        self.shared = shared
+        self.prefix = prefix
+        self.shared_ttl = shared_ttl
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_url(cls, local, url, **kwargs):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("A shared cache URL requires the 'redis' package") from e
+        return cls(local, redis.Redis.from_url(url), **kwargs)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def enabled(self):
+        """False when nothing is ever stored (local TTL 0, no shared store)."""
+        return self.local.ttl > 0 or self.shared is not None
+
+    def get_or_build(self, version, params, builder):
+        """Return the cached value for ``params`` at ``version``, building it on a miss."""
+        if not self.enabled:
+            self._count('misses')
+            return builder()
+        key = self.prefix + hashlib.sha1(f"{version}|{params}".encode()).hexdigest()
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+
+        if self.shared is not None:
+            try:
+                raw = self.shared.get(key)
+            except Exception as e:
+                current_app.logger.warning(f"Shared cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                value = current_app.json.loads(raw)
+                self.local.set(key, value)
+                self._count('shared_hits')
+                return value
+
+        self._count('misses')
+        raw = current_app.json.dumps_bytes(builder())
+        value = current_app.json.loads(raw)
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.setex(key, self.shared_ttl, raw)
+            except Exception as e:
+                current_app.logger.warning(f"Shared cache write failed: {e}")
+        return value
+
+    def stats(self):
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.local_hits + self.shared_hits) / lookups, 3) if lookups else None,
+            'local_entries': len(self.local),
+            'shared': self.shared is not None,
+        }
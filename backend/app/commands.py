@@ -0,0 +1,40 @@
+"""Maintenance commands, run with ``flask --app app <command>``."""
+import sys
+
+import click
+
+from app.models import db, Idea, Project
+
+
+def register_commands(app):
+    @app.cli.command('reconcile-counts')
+    @click.option('--dry-run', is_flag=True, help='Only report how many rows have drifted.')
+    def reconcile_counts(dry_run):
+        """Recompute the ideas' project/comment/like counts and projects.like_count from the source tables.
+
+        With LIKE_BUFFER_ENABLED, run this after a worker died uncleanly
+        (OOM, SIGKILL, timeout): its unflushed like deltas are lost.
+        """
+        ideas = Idea.reconcile_counts(dry_run=dry_run)
+        projects = Project.reconcile_counts(dry_run=dry_run)
+        if dry_run:
+            click.echo(f"{ideas} ideas and {projects} projects have drifted counters")
+            return
+        db.session.commit()
+        click.echo(f"Reconciled counters on {ideas} ideas and {projects} projects")
+
+    @app.cli.command('audit-indexes')
+    def audit_indexes_command():
+        """EXPLAIN the hot queries and fail if any misses its expected index."""
+        from app.index_audit import audit_indexes
+
+        failures = 0
+        for name, expected, problem in audit_indexes():
+            if problem:
+                failures += 1
+                click.echo(f"FAIL  {name}: expected {expected}, {problem}")
+            else:
+                click.echo(f"ok    {name}: {expected}")
+        if failures:
+            click.echo(f"{failures} hot queries are missing their index", err=True)
+            sys.exit(1)
@@ -0,0 +1,57 @@
+"""Response compression.
+
+JSON and text responses of at least ``COMPRESS_MIN_SIZE`` bytes are
+compressed with brotli when the client accepts it and the optional
+``brotli`` package is installed, and with gzip otherwise. A strong ETag on
+a compressed response is made weak, because the bytes now depend on the
+encoding.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+from flask import request
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+
+def init_compression(app):
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+    if min_size is None or min_size < 0:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            body, encoding = brotli.compress(data, quality=brotli_quality), 'br'
+        elif accepted['gzip']:
+            body, encoding = gzip.compress(data, compresslevel=gzip_level, mtime=0), 'gzip'
+        else:
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,111 @@
+"""Connection pool instrumentation and external-pooler support.
+
+The pool itself is sized by the ``SQLALCHEMY_ENGINE_OPTIONS`` profile chosen
+in ``config_extended.py``. This module adds what the config can't express:
+
+- ``TimedQueuePool`` records how long checkouts wait for a free connection,
+  so ``/health`` can show whether workers are starved for connections;
+- in PgBouncer transaction mode (``DB_PGBOUNCER=true``) every transaction
+  may land on a different server connection, so session-level settings
+  can't be used. The statement timeout is then applied with ``SET LOCAL``
+  at the start of each transaction instead of as a connection option.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Checkout counters for one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return entry
+
+
+def pool_status(engine):
+    """Return a JSON-ready summary of ``engine``'s pool."""
+    pool = engine.pool
+    status = {'class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update({
+            'checkouts': stats.checkouts,
+            'timeouts': stats.timeouts,
+            'wait_avg_ms': round(stats.wait_total / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+            'wait_max_ms': round(stats.wait_max * 1000, 3),
+        })
+    return status
+
+
+def _set_local_statement_timeout(timeout_ms):
+    def on_begin(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+    return on_begin
+
+
+def init_db(app, db):
+    """Initialize ``db`` on ``app`` with an instrumented pool.
+
+    Used in place of ``db.init_app(app)``.
+    """
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if not (app.config.get('SQLALCHEMY_DATABASE_URI') or '').startswith('sqlite'):
+        options.setdefault('poolclass', TimedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    # Binds given as option dicts (e.g. the read replica) get the same instrumentation
+    binds = {}
+    for key, bind in (app.config.get('SQLALCHEMY_BINDS') or {}).items():
+        if isinstance(bind, dict) and not str(bind.get('url', '')).startswith('sqlite'):
+            bind = {'poolclass': TimedQueuePool, **bind}
+        binds[key] = bind
+    app.config['SQLALCHEMY_BINDS'] = binds
+    db.init_app(app)
+
+    timeout_ms = app.config.get('DB_STATEMENT_TIMEOUT_MS')
+    if app.config.get('DB_PGBOUNCER') and timeout_ms:
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'begin', _set_local_statement_timeout(timeout_ms))
@@ -0,0 +1,139 @@
+"""Background readiness checks for ``/health/ready``.
+
+``ReadinessMonitor`` runs the deep checks every ``HEALTH_CHECK_INTERVAL``
+seconds on a daemon thread: ``SELECT 1`` on the primary (and the replica,
+if configured), pool saturation, and a GET of Supabase's auth health
+endpoint. Probes only read the last result, so load-balancer polling adds
+no database load however often it happens.
+
+The instance is ready when the databases answer and the primary pool is
+below ``HEALTH_POOL_SATURATION``. An unreachable Supabase only marks it
+degraded, since everything but login keeps working. A result older than
+three intervals (the checker is stuck) counts as not ready.
+
+The thread starts on the first probe in each process, so under
+``gunicorn --preload`` it runs in the workers, not the master.
+"""
+import os
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+from app.db_pool import pool_status
+from app.replica import REPLICA_BIND
+
+
+class ReadinessMonitor:
+    """Runs the readiness checks in the background and caches the result."""
+
+    def __init__(self, app, db, interval=10.0, pool_saturation=0.9, supabase_timeout=2.0):
+        self.app = app
+        self.db = db
+        self.interval = interval
+        self.pool_saturation = pool_saturation
+        self.supabase_timeout = supabase_timeout
+        self._lock = threading.Lock()
+        self._result = None
+        self._checked_at = 0.0
+        self._thread = None
+        self._pid = None
+
+    def get(self):
+        """Return the latest readiness report, checking inline only before the first result."""
+        self._ensure_thread()
+        if self._result is None:
+            with self._lock:
+                if self._result is None:
+                    self._store(self.check())
+        result = self._result
+        age = time.monotonic() - self._checked_at
+        if age > 3 * self.interval:
+            return {**result, "status": "unready", "ready": False, "stale_seconds": round(age, 1)}
+        return result
+
+    def _store(self, result):
+        self._result = result
+        self._checked_at = time.monotonic()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._result = None
+            self._thread = threading.Thread(target=self._run, name='readiness-check', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self._store(self.check())
+            except Exception as e:
+                self.app.logger.error(f"Readiness check failed: {e}")
+
+    def check(self):
+        """Run every check now and return the report."""
+        with self.app.app_context():
+            checks = {"pool": self._check_pool(self.db.engine)}
+            checks["database"] = self._check_database(self.db.engine)
+            if REPLICA_BIND in self.db.engines:
+                checks["replica"] = self._check_database(self.db.engines[REPLICA_BIND])
+            checks["supabase"] = self._check_supabase()
+
+        ready = all(checks[name]["status"] == "ok" for name in ("database", "replica", "pool") if name in checks)
+        if not ready:
+            status = "unready"
+        elif checks["supabase"]["status"] == "error":
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "ready": ready,
+            "checked_at": datetime.utcnow().isoformat(),
+            "checks": checks,
+        }
+
+    @staticmethod
+    def _check_database(engine):
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    def _check_pool(self, engine):
+        # Read before the database check, which takes a connection itself
+        status = pool_status(engine)
+        capacity = status.get('size', 0) + status.get('max_overflow', 0)
+        if capacity <= 0:
+            return {"status": "ok", "saturation": None}
+        saturation = status['checked_out'] / capacity
+        return {
+            "status": "saturated" if saturation >= self.pool_saturation else "ok",
+            "saturation": round(saturation, 3),
+            "checked_out": status['checked_out'],
+            "capacity": capacity,
+        }
+
+    def _check_supabase(self):
+        supabase = self.app.extensions.get("supabase")
+        if supabase is None or not supabase.configured:
+            return {"status": "disabled"}
+        request = urllib.request.Request(
+            f"{supabase.url.rstrip('/')}/auth/v1/health",
+            headers={"apikey": supabase.anon_key}
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.supabase_timeout) as response:
+                response.read()
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
@@ -0,0 +1,141 @@
+"""EXPLAIN-based audit of the indexes behind the hot queries.
+
+``HOT_QUERIES`` lists the queries the list/detail endpoints run, each with
+the index it is expected to use: a name, or ``(table, column)`` for any
+index leading with that column whatever it is called (e.g. the unique
+constraint's index, named by whoever created the table). ``audit_indexes()`` EXPLAINs every one with
+``enable_seqscan = off``, so the verdict doesn't depend on how many rows
+the tables hold right now: if the planner still picks a sequential scan,
+no usable index exists. Run it with ``flask --app app audit-indexes``, or
+at startup with ``INDEX_AUDIT_ON_STARTUP``.
+"""
+import uuid
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.models import db, Comment, Idea, Project, User, UserIdeaLike, UserProjectLike
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON) <statement>``, with the statement's parameters bound normally."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _sample_id():
+    return uuid.uuid4()
+
+
+# (name, expected index, query factory)
+HOT_QUERIES = [
+    ("list_ideas", "ix_ideas_created_at_id",
+     lambda: Idea.query.order_by(Idea.created_at.desc()).limit(10)),
+    ("list_ideas by difficulty", "ix_ideas_difficulty_created_at_id",
+     lambda: Idea.query.filter(Idea.difficulty == 'easy').order_by(Idea.created_at.desc()).limit(10)),
+    ("list_ideas search", "ix_ideas_search_vector",
+     lambda: Idea.search(Idea.query, 'python web')),
+    ("user's ideas", "ix_ideas_user_id",
+     lambda: Idea.query.filter(Idea.user_id == _sample_id())),
+    ("get_idea_comments", "ix_comments_idea_id_created_at_id",
+     lambda: Comment.query.filter(Comment.idea_id == _sample_id()).order_by(Comment.created_at.desc()).limit(20)),
+    ("user's comments", "ix_comments_user_id",
+     lambda: Comment.query.filter(Comment.user_id == _sample_id())),
+    ("profile projects", "ix_projects_user_id",
+     lambda: Project.query.filter(Project.user_id == _sample_id())),
+    ("idea projects", "ix_projects_idea_id",
+     lambda: Project.query.filter(Project.idea_id == _sample_id())),
+    ("featured_projects", "ix_projects_like_count",
+     lambda: Project.query.order_by(Project.like_count.desc()).limit(6)),
+    ("idea likes", "ix_user_idea_likes_idea_id",
+     lambda: UserIdeaLike.query.filter(UserIdeaLike.idea_id == _sample_id())),
+    ("liked_by_me on ideas", "unique_user_idea_like",
+     lambda: UserIdeaLike.query.filter(UserIdeaLike.user_id == _sample_id(),
+                                       UserIdeaLike.idea_id.in_([_sample_id(), _sample_id()]))),
+    ("project likes", "ix_user_project_likes_project_id",
+     lambda: UserProjectLike.query.filter(UserProjectLike.project_id == _sample_id())),
+    ("current_user", ("users", "auth_id"),
+     lambda: User.query.filter(User.auth_id == _sample_id())),
+]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+def explain(query):
+    """Return the plan nodes of ``query`` with sequential scans disabled."""
+    db.session.execute(db.text("SET LOCAL enable_seqscan = off"))
+    plan = db.session.execute(Explain(query.statement)).scalar()
+    return list(_plan_nodes(plan[0]['Plan']))
+
+
+def indexes_on(table, column):
+    """Return the names of the indexes on ``table`` whose first column is ``column``."""
+    rows = db.session.execute(
+        db.text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table AND indexdef ~ :leading"
+        ),
+        {"table": table, "leading": rf'USING \w+ \("?{column}"?[ ,)]'}
+    )
+    return set(rows.scalars())
+
+
+def audit_indexes():
+    """EXPLAIN every hot query; returns ``[(name, expected_index, problem or None)]``."""
+    results = []
+    try:
+        for name, expected, make_query in HOT_QUERIES:
+            if isinstance(expected, tuple):
+                acceptable = indexes_on(*expected)
+                expected = f"an index on {expected[0]}({expected[1]})"
+            else:
+                acceptable = {expected}
+            nodes = explain(make_query())
+            seq_scans = sorted({n['Relation Name'] for n in nodes if n['Node Type'] == 'Seq Scan'})
+            used = {n['Index Name'] for n in nodes if 'Index Name' in n}
+            if seq_scans:
+                problem = f"sequential scan on {', '.join(seq_scans)}"
+            elif not used & acceptable:
+                problem = f"uses {', '.join(sorted(used)) or 'no index'}"
+            else:
+                problem = None
+            results.append((name, expected, problem))
+    finally:
+        db.session.rollback()
+    return results
+
+
+def run_startup_audit(app):
+    """Log any hot query missing its index; enabled by ``INDEX_AUDIT_ON_STARTUP``.
+
+    Runs inside ``create_app``, i.e. in the gunicorn master under
+    ``--preload``, so the pools are emptied afterwards: workers forked from
+    it must not share its connections.
+    """
+    if not app.config.get('INDEX_AUDIT_ON_STARTUP'):
+        return
+    with app.app_context():
+        try:
+            results = audit_indexes()
+        except Exception as e:
+            app.logger.error(f"Index audit failed: {e}")
+            return
+        finally:
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+    for name, expected, problem in results:
+        if problem:
+            app.logger.error(f"Index audit: {name} should use {expected} but {problem}")
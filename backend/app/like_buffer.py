@@ -0,0 +1,172 @@
+"""Write-behind buffer for idea and project like counters.
+
+A popular idea turns ``/ideas/<id>/like`` into a storm of transactions that
+all update the same ``ideas`` row. With the buffer enabled, the per-user
+like record is still committed immediately, but the ``like_count`` change
+is only staged on the session. Once that session commits, the delta joins
+an in-process buffer, and a background thread flushes all buffered deltas
+every ``LIKE_BUFFER_FLUSH_INTERVAL`` seconds with one batched UPDATE per
+table. Serializers add the pending delta so readers see their own likes
+straight away. The buffer is drained when the process exits cleanly; a
+worker that dies uncleanly (OOM, SIGKILL, timeout) loses its unflushed
+deltas, so run ``flask --app app reconcile-counts`` afterwards to recount
+``like_count`` from the like tables.
+
+Each worker process has its own buffer and flush thread. The thread starts
+lazily, so it is created after gunicorn forks rather than in the
+``--preload`` master.
+"""
+import atexit
+import os
+import threading
+
+from sqlalchemy import Integer, column, event, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from app.versions import collection_for_table, collection_versions
+
+_STAGED_KEY = 'like_buffer_staged'
+
+
+class LikeBuffer:
+    """Per-process buffer of pending ``like_count`` deltas."""
+
+    def __init__(self):
+        self.app = None
+        self.db = None
+        self.enabled = False
+        self.interval = 0.25
+        self._lock = threading.Lock()
+        self._pending = {}  # {table: {row_id: delta}}
+        self._inflight = {}  # deltas taken by the running flush, still visible to readers
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._pid = None
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        self.enabled = app.config.get('LIKE_BUFFER_ENABLED', False)
+        self.interval = app.config.get('LIKE_BUFFER_FLUSH_INTERVAL', 0.25)
+        # The buffer is per process, so apps created later (create_app) share it
+        if self.enabled and not event.contains(Session, 'after_commit', self._on_commit):
+            event.listen(Session, 'after_commit', self._on_commit)
+            event.listen(Session, 'after_rollback', self._on_rollback)
+            atexit.register(self.shutdown)
+
+    def stage(self, session, model, row_id, delta):
+        """Stage a delta on ``session``; it is buffered only if the session commits."""
+        staged = session.info.setdefault(_STAGED_KEY, {})
+        key = (model.__table__, row_id)
+        staged[key] = staged.get(key, 0) + delta
+
+    def staged(self, session, model, row_id):
+        """Return the delta staged on ``session`` but not yet committed."""
+        return session.info.get(_STAGED_KEY, {}).get((model.__table__, row_id), 0)
+
+    def pending(self, model, row_id):
+        """Return the committed delta for a row that has not been flushed yet."""
+        table = model.__table__
+        return self._pending.get(table, {}).get(row_id, 0) + self._inflight.get(table, {}).get(row_id, 0)
+
+    def like_count(self, instance):
+        """Return ``instance.like_count`` including the unflushed delta."""
+        count = instance.like_count or 0
+        if self.enabled:
+            count += self.pending(type(instance), instance.id)
+        return max(count, 0)
+
+    def _on_commit(self, session):
+        staged = session.info.pop(_STAGED_KEY, None)
+        if not staged:
+            return
+        with self._lock:
+            for (table, row_id), delta in staged.items():
+                rows = self._pending.setdefault(table, {})
+                rows[row_id] = rows.get(row_id, 0) + delta
+        self._ensure_thread()
+
+    def _on_rollback(self, session):
+        session.info.pop(_STAGED_KEY, None)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='like-buffer-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.app.logger.error(f"Like buffer flush failed: {e}")
+
+    def flush(self):
+        """Write all buffered deltas to the database, one UPDATE per table.
+
+        On failure the deltas are put back so the next flush retries them.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            batch = {table: {k: v for k, v in rows.items() if v} for table, rows in batch.items()}
+            batch = {table: rows for table, rows in batch.items() if rows}
+            self._inflight = batch
+        if not batch:
+            return
+
+        try:
+            with self.app.app_context():
+                with self.db.engine.begin() as conn:
+                    for table, rows in batch.items():
+                        deltas = values(
+                            column('id', UUID(as_uuid=True)),
+                            column('delta', Integer),
+                            name='deltas'
+                        ).data(list(rows.items()))
+                        conn.execute(
+                            table.update()
+                            .where(table.c.id == deltas.c.id)
+                            .values(
+                                like_count=self.db.func.greatest(
+                                    self.db.func.coalesce(table.c.like_count, 0) + deltas.c.delta, 0
+                                ),
+                                updated_at=table.c.updated_at
+                            )
+                        )
+        except Exception:
+            with self._lock:
+                for table, rows in batch.items():
+                    pending = self._pending.setdefault(table, {})
+                    for row_id, delta in rows.items():
+                        pending[row_id] = pending.get(row_id, 0) + delta
+                self._inflight = {}
+            raise
+        with self._lock:
+            self._inflight = {}
+        collections = {collection_for_table(table.name) for table in batch} - {None}
+        if collections:
+            with self.app.app_context():
+                collection_versions.bump(collections)
+
+    def shutdown(self):
+        """Stop the flush thread and drain whatever is still buffered."""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception as e:
+            self.app.logger.error(f"Like buffer drain failed on shutdown: {e}")
+
+
+like_buffer = LikeBuffer()
@@ -0,0 +1,510 @@
+"""Prometheus metrics aggregated across gunicorn workers.
+
+Every worker writes its own values into mmap'd files in ``METRICS_DIR``,
+one file per kind and pid, so recording never takes a cross-process lock
+and never does a syscall once a key exists. Any worker answering
+``/metrics`` reads all the files and merges them:
+
+- ``counter_<pid>.db``: counters and histogram buckets, summed.
+- ``max_<pid>.db``: high-water marks, merged with ``max``.
+- ``gauge_<pid>.db``: in-flight requests, pool usage and similar live
+  values, summed; a worker resets its file when it starts.
+
+When a worker has exited, ``mark_process_dead`` folds its counter and max
+files into ``counter_aggregate.db``/``max_aggregate.db`` (so counters never
+go backwards when a worker is recycled) and deletes its gauge file. Each
+scrape does this for every pid that is no longer running; it can also be
+called from a gunicorn ``child_exit`` hook::
+
+    def child_exit(server, worker):
+        mark_process_dead(os.environ["METRICS_DIR"], worker.pid)
+
+Empty ``METRICS_DIR`` when the server is redeployed so old totals don't
+carry over; a tmpfs such as ``/dev/shm`` keeps the files off disk. Without
+``METRICS_DIR`` the values stay in memory and ``/metrics`` only shows the
+worker that answered.
+
+Per-worker gauges (pool usage, cache hit/miss totals) are refreshed at
+most every ``METRICS_REFRESH_INTERVAL`` seconds, at the end of a request.
+"""
+import glob
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+try:
+    import fcntl
+except ImportError:  # Windows: no forking workers to merge
+    fcntl = None
+
+from app.db_pool import pool_status
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# (name, type, help, file kind)
+METRICS = (
+    ('catalog_http_requests_total', 'counter', 'Requests by endpoint, method and status.', 'counter'),
+    ('catalog_http_request_duration_seconds', 'histogram', 'Request latency by endpoint.', 'counter'),
+    ('catalog_http_requests_in_flight', 'gauge', 'Requests being handled right now.', 'gauge'),
+    ('catalog_db_queries_total', 'counter', 'SQL statements run by requests.', 'counter'),
+    ('catalog_db_seconds_total', 'counter', 'Time requests spent in SQL statements.', 'counter'),
+    ('catalog_db_slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_MS.', 'counter'),
+    ('catalog_slow_requests_total', 'counter', 'Requests over SLOW_REQUEST_QUERIES or SLOW_REQUEST_DB_MS.', 'counter'),
+    ('catalog_db_queries_per_request_max', 'gauge', 'Most SQL statements run by a single request.', 'max'),
+    ('catalog_db_pool_size', 'gauge', 'Configured pool size, summed over workers.', 'gauge'),
+    ('catalog_db_pool_checked_out', 'gauge', 'Pool connections in use.', 'gauge'),
+    ('catalog_db_pool_overflow', 'gauge', 'Connections open beyond the pool size.', 'gauge'),
+    ('catalog_db_pool_checkouts_total', 'counter', 'Pool checkouts.', 'counter'),
+    ('catalog_db_pool_timeouts_total', 'counter', 'Pool checkouts that timed out.', 'counter'),
+    ('catalog_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a pool connection.', 'counter'),
+    ('catalog_cache_hits_total', 'counter', 'Cache lookups answered from the cache.', 'counter'),
+    ('catalog_cache_misses_total', 'counter', 'Cache lookups that missed.', 'counter'),
+)
+KINDS = {name: kind for name, _, _, kind in METRICS}
+
+_HEADER = struct.Struct('<Q')  # bytes in use
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_INITIAL_SIZE = 64 * 1024
+_AGGREGATE = 'aggregate'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def sample_key(name, **labels):
+    """Return the exposition-format series name, e.g. ``name{endpoint="x"}``."""
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _entries(data):
+    """Yield ``(key, value, value_offset)`` from a value file's bytes."""
+    # A file read while its owner grows it can be shorter than the header says
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data)) if len(data) >= _HEADER.size else 0
+    pos = _HEADER.size
+    while pos + _LENGTH.size <= used:
+        length = _LENGTH.unpack_from(data, pos)[0]
+        key = data[pos + _LENGTH.size:pos + _LENGTH.size + length].decode()
+        pos += _LENGTH.size + length
+        pos += -pos % 8
+        if pos + _VALUE.size > used:
+            return
+        yield key, _VALUE.unpack_from(data, pos)[0], pos
+        pos += _VALUE.size
+
+
+class ValueFile:
+    """Float values by key in an mmap'd file; only the owning process writes it.
+
+    Entries are appended (length, key, padding, float64) and the header's
+    used-bytes count is advanced after the entry is complete, so readers in
+    other processes never see a partial key.
+    """
+
+    def __init__(self, path, reset=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._positions = {}
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if reset:
+                os.ftruncate(fd, 0)
+            size = os.fstat(fd).st_size
+            if size < _INITIAL_SIZE:
+                os.ftruncate(fd, _INITIAL_SIZE)
+                size = _INITIAL_SIZE
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._used = max(_HEADER.unpack_from(self._map, 0)[0], _HEADER.size)
+        for key, _, pos in _entries(self._map):
+            self._positions[key] = pos
+
+    def _position(self, key):
+        pos = self._positions.get(key)
+        if pos is not None:
+            return pos
+        encoded = key.encode()
+        start = self._used
+        pos = start + _LENGTH.size + len(encoded)
+        pos += -pos % 8
+        end = pos + _VALUE.size
+        if end > len(self._map):
+            self._grow(end)
+        _LENGTH.pack_into(self._map, start, len(encoded))
+        self._map[start + _LENGTH.size:start + _LENGTH.size + len(encoded)] = encoded
+        _VALUE.pack_into(self._map, pos, 0.0)
+        self._used = end
+        _HEADER.pack_into(self._map, 0, end)
+        self._positions[key] = pos
+        return pos
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.flush()
+        self._map.close()
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def add(self, key, amount):
+        with self._lock:
+            pos = self._position(key)
+            _VALUE.pack_into(self._map, pos, _VALUE.unpack_from(self._map, pos)[0] + amount)
+
+    def set(self, key, value):
+        with self._lock:
+            _VALUE.pack_into(self._map, self._position(key), value)
+
+    def max(self, key, value):
+        with self._lock:
+            pos = self._position(key)
+            if value > _VALUE.unpack_from(self._map, pos)[0]:
+                _VALUE.pack_into(self._map, pos, value)
+
+    def items(self):
+        with self._lock:
+            return [(key, value) for key, value, _ in _entries(self._map)]
+
+    @staticmethod
+    def read(path):
+        with open(path, 'rb') as f:
+            return [(key, value) for key, value, _ in _entries(f.read())]
+
+
+def _pack(items):
+    """Return the bytes of a value file holding ``items``."""
+    body = bytearray()
+    for key, value in items:
+        encoded = key.encode()
+        body += _LENGTH.pack(len(encoded)) + encoded
+        body += bytes(-(_HEADER.size + len(body)) % 8)
+        body += _VALUE.pack(value)
+    return _HEADER.pack(_HEADER.size + len(body)) + bytes(body)
+
+
+class MemoryValues:
+    """In-process stand-in for ``ValueFile`` when no ``METRICS_DIR`` is set."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def add(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        self._values[key] = value
+
+    def max(self, key, value):
+        with self._lock:
+            if value > self._values.get(key, 0.0):
+                self._values[key] = value
+
+    def items(self):
+        with self._lock:
+            return list(self._values.items())
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _directory_lock(directory):
+    """Serialize merging and folding of the files in ``directory`` across processes."""
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(os.path.join(directory, '.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _fold_dead(directory, pid):
+    try:
+        os.remove(os.path.join(directory, f'gauge_{pid}.db'))
+    except FileNotFoundError:
+        pass
+    for kind in ('counter', 'max'):
+        path = os.path.join(directory, f'{kind}_{pid}.db')
+        try:
+            values = ValueFile.read(path)
+        except FileNotFoundError:
+            continue
+        aggregate = os.path.join(directory, f'{kind}_{_AGGREGATE}.db')
+        try:
+            totals = dict(ValueFile.read(aggregate))
+        except FileNotFoundError:
+            totals = {}
+        for key, value in values:
+            if kind == 'max':
+                totals[key] = max(totals.get(key, value), value)
+            else:
+                totals[key] = totals.get(key, 0.0) + value
+        # Readers see either the old or the new aggregate, never a partial one
+        tmp = f'{aggregate}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(_pack(totals.items()))
+        os.replace(tmp, aggregate)
+        os.remove(path)
+
+
+def mark_process_dead(directory, pid):
+    """Fold an exited worker's counters and maxima into the aggregate files and drop its gauges."""
+    with _directory_lock(directory):
+        _fold_dead(directory, pid)
+
+
+class MetricsStore:
+    """The current worker's counter, max and gauge values, opened per process."""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._pid = None
+        self._files = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._files
+        with self._lock:
+            if self._pid != pid:
+                if self.directory:
+                    os.makedirs(self.directory, exist_ok=True)
+                    self._files = {
+                        kind: ValueFile(os.path.join(self.directory, f'{kind}_{pid}.db'), reset=kind == 'gauge')
+                        for kind in ('counter', 'max', 'gauge')
+                    }
+                else:
+                    self._files = {kind: MemoryValues() for kind in ('counter', 'max', 'gauge')}
+                self._pid = pid
+        return self._files
+
+    def add(self, kind, key, amount=1.0):
+        self._open()[kind].add(key, amount)
+
+    def set(self, kind, key, value):
+        self._open()[kind].set(key, value)
+
+    def max(self, key, value):
+        self._open()['max'].max(key, value)
+
+    def _files_by_kind(self):
+        """Yield ``(kind, pid)`` for the value files in the directory; pid may be ``aggregate``."""
+        for path in glob.glob(os.path.join(self.directory, '*_*.db')):
+            kind, _, pid = os.path.basename(path)[:-3].partition('_')
+            if kind in ('counter', 'max', 'gauge') and (pid.isdigit() or pid == _AGGREGATE):
+                yield kind, pid
+
+    def collect(self):
+        """Return ``({key: value}, live worker count)`` merged over all workers."""
+        files = self._open()
+        if not self.directory:
+            merged = {}
+            for kind in ('counter', 'gauge', 'max'):
+                merged.update(files[kind].items())
+            return merged, 1
+
+        merged, workers = {}, 0
+        with _directory_lock(self.directory):
+            for pid in {pid for _, pid in self._files_by_kind()}:
+                if pid != _AGGREGATE and not _pid_alive(int(pid)):
+                    _fold_dead(self.directory, int(pid))
+            for kind, pid in self._files_by_kind():
+                if kind == 'gauge':
+                    workers += 1
+                for key, value in ValueFile.read(os.path.join(self.directory, f'{kind}_{pid}.db')):
+                    if kind == 'max':
+                        merged[key] = max(merged.get(key, value), value)
+                    else:
+                        merged[key] = merged.get(key, 0.0) + value
+        return merged, workers
+
+
+class Metrics:
+    """Records request, SQL, pool and cache metrics and renders them for Prometheus."""
+
+    def __init__(self, app, db, directory=None, refresh_interval=1.0):
+        self.app = app
+        self.db = db
+        self.store = MetricsStore(directory)
+        self.refresh_interval = refresh_interval
+        self._refreshed_at = 0.0
+
+    def inc(self, name, amount=1.0, **labels):
+        self.store.add(KINDS[name], sample_key(name, **labels), amount)
+
+    def set(self, name, value, **labels):
+        self.store.set(KINDS[name], sample_key(name, **labels), value)
+
+    def max(self, name, value, **labels):
+        self.store.max(sample_key(name, **labels), value)
+
+    def observe_request(self, endpoint, method, status, seconds):
+        self.inc('catalog_http_requests_total', endpoint=endpoint, method=method, status=status)
+        name = 'catalog_http_request_duration_seconds'
+        # Buckets are stored non-cumulative (one write per request) and summed up in render()
+        le = next(b for b in LATENCY_BUCKETS if seconds <= b)
+        self.store.add('counter', sample_key(f'{name}_bucket', endpoint=endpoint, le=_bucket_label(le)))
+        self.store.add('counter', sample_key(f'{name}_sum', endpoint=endpoint), seconds)
+        self.store.add('counter', sample_key(f'{name}_count', endpoint=endpoint))
+
+    def observe_queries(self, endpoint, stats, slow_request):
+        """Add one request's ``RequestQueryStats`` (see app/query_stats.py)."""
+        self.inc('catalog_db_queries_total', stats.count, endpoint=endpoint)
+        self.inc('catalog_db_seconds_total', stats.db_time, endpoint=endpoint)
+        if stats.slow_count:
+            self.inc('catalog_db_slow_queries_total', stats.slow_count, endpoint=endpoint)
+        if slow_request:
+            self.inc('catalog_slow_requests_total', endpoint=endpoint)
+        self.max('catalog_db_queries_per_request_max', stats.count, endpoint=endpoint)
+
+    def refresh(self, force=False):
+        """Publish this worker's pool and cache numbers, at most once per interval."""
+        now = time.monotonic()
+        if not force and now - self._refreshed_at < self.refresh_interval:
+            return
+        self._refreshed_at = now
+
+        for bind, engine in self.db.engines.items():
+            pool = 'primary' if bind is None else bind
+            status = pool_status(engine)
+            for field, name in (('size', 'catalog_db_pool_size'),
+                                ('checked_out', 'catalog_db_pool_checked_out'),
+                                ('overflow', 'catalog_db_pool_overflow')):
+                if field in status:
+                    self.set(name, status[field], pool=pool)
+            stats = getattr(engine.pool, 'stats', None)
+            if stats is not None:
+                # Process-lifetime totals: written as absolute values, summed over workers
+                self.set('catalog_db_pool_checkouts_total', stats.checkouts, pool=pool)
+                self.set('catalog_db_pool_timeouts_total', stats.timeouts, pool=pool)
+                self.set('catalog_db_pool_wait_seconds_total', stats.wait_total, pool=pool)
+
+        for cache, hits, misses in self._cache_counts():
+            self.set('catalog_cache_hits_total', hits, cache=cache)
+            self.set('catalog_cache_misses_total', misses, cache=cache)
+
+    def _cache_counts(self):
+        extensions = self.app.extensions
+        for name in ('user_cache', 'liked_ideas_cache', 'featured_projects_cache'):
+            cache = extensions.get(name)
+            if cache is not None:
+                yield name, cache.hits, cache.misses
+        ideas_cache = extensions.get('ideas_cache')
+        if ideas_cache is not None:
+            yield 'ideas_cache', ideas_cache.local_hits + ideas_cache.shared_hits, ideas_cache.misses
+        verifier = extensions.get('token_verifier')
+        if verifier is not None:
+            yield 'auth_tokens', verifier.cache.hits, verifier.cache.misses
+
+    def render(self):
+        """Return all metrics, merged over workers, in Prometheus text format."""
+        self.refresh(force=True)
+        values, workers = self.store.collect()
+        series = sorted(values.items())
+        lines = [
+            '# HELP catalog_workers Worker processes reporting metrics.',
+            '# TYPE catalog_workers gauge',
+            f'catalog_workers {workers}',
+        ]
+        for name, kind, help_text, _ in METRICS:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'histogram':
+                lines.extend(_histogram_lines(name, values))
+            else:
+                lines.extend(f'{key} {_format(value)}' for key, value in series
+                             if key == name or key.startswith(name + '{'))
+
+        lines.append('# HELP catalog_cache_hit_ratio Share of cache lookups that hit, over all workers.')
+        lines.append('# TYPE catalog_cache_hit_ratio gauge')
+        for key, hits in series:
+            if key.startswith('catalog_cache_hits_total{'):
+                labels = key[len('catalog_cache_hits_total'):]
+                lookups = hits + values.get('catalog_cache_misses_total' + labels, 0.0)
+                if lookups:
+                    lines.append(f'catalog_cache_hit_ratio{labels} {_format(hits / lookups)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _bucket_label(le):
+    return '+Inf' if le == math.inf else repr(le)
+
+
+def _format(value):
+    return str(int(value)) if value == int(value) and abs(value) < 1e15 else repr(value)
+
+
+def _histogram_lines(name, values):
+    lines = []
+    for key in sorted(k for k in values if k.startswith(f'{name}_count{{')):
+        labels = key[len(f'{name}_count{{'):-1]
+        cumulative = 0.0
+        for le in LATENCY_BUCKETS:
+            bucket_labels = f'{labels},le="{_bucket_label(le)}"'
+            cumulative += values.get(f'{name}_bucket{{{bucket_labels}}}', 0.0)
+            lines.append(f'{name}_bucket{{{bucket_labels}}} {_format(cumulative)}')
+        lines.append(f'{name}_sum{{{labels}}} {_format(values.get(f"{name}_sum{{{labels}}}", 0.0))}')
+        lines.append(f'{key} {_format(values[key])}')
+    return lines
+
+
+def init_metrics(app, db):
+    """Record per-endpoint request metrics; the recorder is ``app.extensions["metrics"]``."""
+    metrics = app.extensions['metrics'] = Metrics(
+        app, db,
+        directory=app.config.get('METRICS_DIR'),
+        refresh_interval=app.config.get('METRICS_REFRESH_INTERVAL', 1.0)
+    )
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_in_flight = True
+        metrics.inc('catalog_http_requests_in_flight')
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            metrics.observe_request(request.endpoint or 'unmatched', request.method,
+                                    response.status_code, time.perf_counter() - started)
+            metrics.refresh()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        # after_request is skipped when the view raised; count those as 500s
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            metrics.observe_request(request.endpoint or 'unmatched', request.method,
+                                    500, time.perf_counter() - started)
+        if g.pop('metrics_in_flight', False):
+            metrics.inc('catalog_http_requests_in_flight', -1)
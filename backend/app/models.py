@@ -1,23 +1,99 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, insert as pg_insert
+from sqlalchemy.orm.attributes import set_committed_value
 import uuid
+from collections import namedtuple
 from datetime import datetime
 from dotenv import load_dotenv
-from flask import Flask
-import os
-import sys
-
-# Add the backend directory to the path so we can import config
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from config import Config
-
-# Initialize SQLAlchemy without binding to an app initially
-db = SQLAlchemy()
-def create_app():
-    app = Flask(__name__)
-    app.config.from_object(Config)
-    db.init_app(app)
-    return app
+from app.like_buffer import like_buffer
+from app.serialization import columns_dict
+from app.replica import RoutingSession
+from app.versions import COLLECTIONS, sequence_name
+
+# Initialize SQLAlchemy without binding to an app initially.
+# RoutingSession sends reads in @read_replica views to the replica bind, if any.
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Version counters behind the collection ETags (see app/versions.py)
+collection_version_sequences = [db.Sequence(sequence_name(name), metadata=db.metadata) for name in COLLECTIONS]
+
+def _change_like_count(instance, delta, commit):
+    """Atomically add ``delta`` to ``instance.like_count`` in SQL.
+
+    Runs a single ``UPDATE ... SET like_count = like_count + :delta RETURNING
+    like_count`` so concurrent likes from different workers never overwrite
+    each other, and the count never drops below zero. The returned value is
+    written back to ``instance`` without marking it dirty.
+
+    With the like buffer enabled the delta is only staged on the session and
+    written by the buffer's next flush after the session commits.
+    """
+    model = type(instance)
+    if like_buffer.enabled:
+        like_buffer.stage(db.session, model, instance.id, delta)
+        new_count = max(like_buffer.like_count(instance) + like_buffer.staged(db.session, model, instance.id), 0)
+        if commit:
+            db.session.commit()
+        return new_count
+    try:
+        stmt = (
+            db.update(model)
+            .where(model.id == instance.id)
+            # A like isn't an edit; keep onupdate from touching updated_at
+            .values(
+                like_count=db.func.greatest(db.func.coalesce(model.like_count, 0) + delta, 0),
+                updated_at=model.updated_at
+            )
+            .returning(model.like_count)
+            .execution_options(synchronize_session=False)
+        )
+        new_count = db.session.execute(stmt).scalar_one()
+        set_committed_value(instance, 'like_count', new_count)
+        if commit:
+            db.session.commit()
+        return new_count
+    except Exception:
+        try:
+            db.session.rollback()
+        except Exception:
+            pass
+        raise
+
+def _add_like_record(model, constraint, **keys):
+    """Insert a like row with ``ON CONFLICT DO NOTHING``; True if it was new."""
+    table = model.__table__
+    stmt = (
+        pg_insert(table)
+        .values(id=uuid.uuid4(), created_at=datetime.utcnow(), **keys)
+        .on_conflict_do_nothing(constraint=constraint)
+        .returning(table.c.id)
+    )
+    return db.session.execute(stmt).first() is not None
+
+def _remove_like_record(model, **keys):
+    """Delete a like row in one statement; True if one was removed."""
+    table = model.__table__
+    stmt = (
+        db.delete(table)
+        .where(*(table.c[name] == value for name, value in keys.items()))
+        .returning(table.c.id)
+    )
+    return db.session.execute(stmt).first() is not None
+
+def _liked_ids(column, user_column, user_id, target_ids=None):
+    """Return the subset of ``target_ids`` (UUIDs) liked by ``user_id``, in one IN query.
+
+    With ``target_ids`` of None, return everything the user has liked.
+    """
+    if not user_id or (target_ids is not None and not target_ids):
+        return set()
+    query = db.session.query(column).filter(user_column == user_id)
+    if target_ids is not None:
+        query = query.filter(column.in_(list(target_ids)))
+    return {target_id for (target_id,) in query.all()}
+
+# Immutable copy of a User row, safe to cache and share across requests and threads
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'auth_id', 'name', 'email', 'github_username'])
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -35,15 +111,16 @@ class User(db.Model):
     def __repr__(self):
         return f'<User {self.email}>'
     
+    # Columns copied as-is by to_dict; UUIDs and datetimes are left to the JSON encoder
+    _serialized_columns = ('id', 'name', 'github_username', 'email', 'created_at')
+    
     def to_dict(self):
         """Convert user object to dictionary for JSON serialization."""
-        return {
-            'id': str(self.id),
-            'name': self.name,
-            'github_username': self.github_username,
-            'email': self.email,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return columns_dict(self, self._serialized_columns)
+    
+    def snapshot(self):
+        """Return a detached, immutable ``UserSnapshot`` of this user."""
+        return UserSnapshot(self.id, self.auth_id, self.name, self.email, self.github_username)
     
     @classmethod
     def create_from_auth(cls, auth_id, email, name=None, github_username=None):
@@ -72,6 +149,12 @@ class Project(db.Model):
     # Foreign Keys
     user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
     idea_id = db.Column(UUID(as_uuid=True), db.ForeignKey('ideas.id'), nullable=False)  # REMOVED unique=True
+
+    __table_args__ = (
+        db.Index('ix_projects_user_id', 'user_id'),
+        db.Index('ix_projects_idea_id', 'idea_id'),
+        db.Index('ix_projects_like_count', 'like_count'),
+    )
     
     # Relationships
     user = db.relationship('User', backref=db.backref('projects', lazy=True))
@@ -80,24 +163,20 @@ class Project(db.Model):
     def __repr__(self):
         return f'<Project {self.title}>'
     
+    # Columns copied as-is by to_dict; UUIDs and datetimes are left to the JSON encoder
+    _serialized_columns = (
+        'id', 'title', 'description', 'image_url', 'repo_url', 'live_url', 'tags',
+        'created_at', 'updated_at', 'user_id', 'idea_id'
+    )
+    
     def to_dict(self):
         """Convert project object to dictionary for JSON serialization."""
-        return {
-            'id': str(self.id),
-            'title': self.title,
-            'description': self.description,
-            'image_url': self.image_url,
-            'repo_url': self.repo_url,
-            'live_url': self.live_url,
-            'tags': self.tags,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'like_count': self.like_count,
-            'user_id': str(self.user_id),
-            'idea_id': str(self.idea_id),
-            'username': self.user.name if self.user else None,
-            'user_email': self.user.email if self.user else None
-        }
+        data = columns_dict(self, self._serialized_columns)
+        user = self.user
+        data['like_count'] = like_buffer.like_count(self)
+        data['username'] = user.name if user else None
+        data['user_email'] = user.email if user else None
+        return data
     
     @classmethod
     def create(cls, title, description, repo_url, user_id, idea_id, live_url=None, tags=None):
@@ -114,22 +193,53 @@ class Project(db.Model):
         return project
     
     def increase_like(self, commit: bool = True):
-        """Increment the project's like_count by one and optionally commit to DB.
+        """Atomically increment the project's like_count and optionally commit to DB.
 
         Returns the new like_count.
         """
-        try:
-            self.like_count = (self.like_count or 0) + 1
-            if commit:
-                db.session.add(self)
-                db.session.commit()
-            return self.like_count
-        except Exception:
-            try:
-                db.session.rollback()
-            except Exception:
-                pass
-            raise
+        return _change_like_count(self, 1, commit)
+
+    def decrease_like(self, commit: bool = True):
+        """Atomically decrement the project's like_count (not below zero) and optionally commit to DB.
+
+        Returns the new like_count.
+        """
+        return _change_like_count(self, -1, commit)
+
+    @classmethod
+    def reconcile_counts(cls, dry_run=False):
+        """Recompute ``like_count`` from ``user_project_likes`` for every project that drifted.
+
+        Only projects with like rows are touched: ``user_project_likes`` was
+        added without a backfill, so a project liked before then has a
+        ``like_count`` but no rows to recount it from.
+
+        Returns the number of projects fixed or, with ``dry_run``, that would
+        be fixed. Does not commit.
+        """
+        likes = (
+            db.select(UserProjectLike.project_id, db.func.count().label('like_count'))
+            .group_by(UserProjectLike.project_id)
+            .subquery()
+        )
+        drifted = db.and_(cls.id == likes.c.project_id, cls.like_count.is_distinct_from(likes.c.like_count))
+        if dry_run:
+            return db.session.execute(db.select(db.func.count()).select_from(cls).where(drifted)).scalar_one()
+        result = db.session.execute(
+            db.update(cls)
+            .where(drifted)
+            .values(like_count=likes.c.like_count, updated_at=cls.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+# Weighted tsvector expression backing Idea.search_vector (title > description > solution).
+# Kept in sync with the generated column created by migration 4f2a9c1d7e3b.
+IDEA_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(solution, '')), 'C')"
+)
 
 class Idea(db.Model):
     __tablename__ = 'ideas'
@@ -145,6 +255,26 @@ class Idea(db.Model):
     # Foreign Key
     solution=db.Column(db.Text, nullable=True)  # URL to a solution or related resource
     user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+
+    # Denormalized counters, maintained in the same transaction as the insert
+    # that changes them (see adjust_counts) and repaired by `flask reconcile-counts`
+    project_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Full-text search document, generated by Postgres from title/description/solution.
+    # Deferred so it is never loaded as part of a normal Idea row.
+    search_vector = db.deferred(db.Column(
+        TSVECTOR,
+        db.Computed(IDEA_SEARCH_VECTOR_SQL, persisted=True),
+        nullable=True
+    ))
+
+    __table_args__ = (
+        db.Index('ix_ideas_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_ideas_created_at_id', 'created_at', 'id'),
+        db.Index('ix_ideas_difficulty_created_at_id', 'difficulty', 'created_at', 'id'),
+        db.Index('ix_ideas_user_id', 'user_id'),
+    )
     
     # Relationships
     user = db.relationship('User', backref=db.backref('ideas', lazy=True))
@@ -153,24 +283,112 @@ class Idea(db.Model):
     def __repr__(self):
         return f'<Idea {self.title}>'
     
+    # Columns copied as-is by to_dict; UUIDs and datetimes are left to the JSON encoder
+    _serialized_columns = (
+        'id', 'title', 'description', 'image_url', 'created_at', 'updated_at', 'status',
+        'difficulty', 'user_id', 'solution', 'project_count', 'comment_count'
+    )
+    
     def to_dict(self):
         """Convert idea object to dictionary for JSON serialization."""
-        return {
-            'id': str(self.id),
-            'title': self.title,
-            'description': self.description,
-            'image_url': self.image_url,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'like_count': self.like_count,
-            'status': self.status,
-            'difficulty': self.difficulty,
-            'user_id': str(self.user_id),
-            'author': self.user.name if self.user else None,
-            'solution': self.solution,
-            'project_count': self.project_count(),
-            'has_projects': self.has_projects()
-        }
+        data = columns_dict(self, self._serialized_columns)
+        user = self.user
+        data['like_count'] = like_buffer.like_count(self)
+        data['author'] = user.name if user else None
+        data['has_projects'] = (data['project_count'] or 0) > 0
+        return data
+
+    @classmethod
+    def with_author(cls, query=None):
+        """Eager-load each idea's author in the same SELECT as the ideas."""
+        query = cls.query if query is None else query
+        return query.options(db.joinedload(cls.user))
+
+    @classmethod
+    def to_dict_many(cls, ideas):
+        """Serialize a page of ideas without any further queries.
+
+        Load the ideas through ``with_author`` so ``author`` is already
+        present; project and comment counts are columns on the idea itself.
+        """
+        return [idea.to_dict() for idea in ideas]
+
+    @classmethod
+    def adjust_counts(cls, idea_id, projects=0, comments=0):
+        """Atomically add to an idea's ``project_count``/``comment_count``. Does not commit.
+
+        Call it in the same transaction as the insert or delete that changed
+        the count, so the counters can't drift from the rows they count.
+        """
+        db.session.execute(
+            db.update(cls)
+            .where(cls.id == idea_id)
+            .values(
+                project_count=db.func.greatest(cls.project_count + projects, 0),
+                comment_count=db.func.greatest(cls.comment_count + comments, 0),
+                # Counter changes aren't edits; keep onupdate from touching updated_at
+                updated_at=cls.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    def reconcile_counts(cls, dry_run=False):
+        """Recompute ``project_count``/``comment_count``/``like_count`` for every idea that drifted.
+
+        Runs as one UPDATE (or SELECT with ``dry_run``) over grouped counts of
+        ``projects``, ``comments`` and ``user_idea_likes``. Returns the number
+        of ideas fixed or, with ``dry_run``, that would be fixed. Does not commit.
+        """
+        likes = (
+            db.select(UserIdeaLike.idea_id, db.func.count().label('n'))
+            .group_by(UserIdeaLike.idea_id)
+            .subquery()
+        )
+        projects = (
+            db.select(Project.idea_id, db.func.count().label('n'))
+            .group_by(Project.idea_id)
+            .subquery()
+        )
+        comments = (
+            db.select(Comment.idea_id, db.func.count().label('n'))
+            .group_by(Comment.idea_id)
+            .subquery()
+        )
+        actual = (
+            db.select(
+                cls.id.label('idea_id'),
+                db.func.coalesce(projects.c.n, 0).label('project_count'),
+                db.func.coalesce(comments.c.n, 0).label('comment_count'),
+                db.func.coalesce(likes.c.n, 0).label('like_count')
+            )
+            .outerjoin(projects, projects.c.idea_id == cls.id)
+            .outerjoin(comments, comments.c.idea_id == cls.id)
+            .outerjoin(likes, likes.c.idea_id == cls.id)
+            .subquery()
+        )
+        drifted = db.and_(
+            cls.id == actual.c.idea_id,
+            db.or_(
+                cls.project_count != actual.c.project_count,
+                cls.comment_count != actual.c.comment_count,
+                cls.like_count.is_distinct_from(actual.c.like_count)
+            )
+        )
+        if dry_run:
+            return db.session.execute(db.select(db.func.count()).select_from(cls).where(drifted)).scalar_one()
+        result = db.session.execute(
+            db.update(cls)
+            .where(drifted)
+            .values(
+                project_count=actual.c.project_count,
+                comment_count=actual.c.comment_count,
+                like_count=actual.c.like_count,
+                updated_at=cls.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
     
     @classmethod
     def create(cls, title, description, user_id):
@@ -183,30 +401,36 @@ class Idea(db.Model):
         return idea
     
     def increase_like(self, commit: bool = True):
-        """Increment the idea's like_count by one and optionally commit to DB.
+        """Atomically increment the idea's like_count and optionally commit to DB.
 
         Returns the new like_count.
         """
-        try:
-            self.like_count = (self.like_count or 0) + 1
-            if commit:
-                db.session.add(self)
-                db.session.commit()
-            return self.like_count
-        except Exception:
-            try:
-                db.session.rollback()
-            except Exception:
-                pass
-            raise
+        return _change_like_count(self, 1, commit)
+
+    def decrease_like(self, commit: bool = True):
+        """Atomically decrement the idea's like_count (not below zero) and optionally commit to DB.
+
+        Returns the new like_count.
+        """
+        return _change_like_count(self, -1, commit)
     
     def has_projects(self):  # Renamed from has_project
         """Check if this idea has been implemented as projects."""
-        return len(self.projects) > 0
+        return (self.project_count or 0) > 0
     
-    def project_count(self):
-        """Get the number of projects implementing this idea."""
-        return len(self.projects)
+    @classmethod
+    def search(cls, query, text, ranked=True):
+        """Restrict ``query`` to ideas matching ``text``.
+
+        ``text`` uses web-search syntax (quoted phrases, ``or``, ``-exclude``).
+        The match runs against the GIN-indexed ``search_vector`` column. With
+        ``ranked`` the matches are also ordered by relevance.
+        """
+        ts_query = db.func.websearch_to_tsquery('english', text)
+        query = query.filter(cls.search_vector.op('@@')(ts_query))
+        if ranked:
+            query = query.order_by(db.func.ts_rank_cd(cls.search_vector, ts_query).desc())
+        return query
     
     def is_liked_by_user(self, user_id):
         """Check if a specific user has liked this idea."""
@@ -223,7 +447,10 @@ class UserIdeaLike(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Ensure a user can only like an idea once
-    __table_args__ = (db.UniqueConstraint('user_id', 'idea_id', name='unique_user_idea_like'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idea_id', name='unique_user_idea_like'),
+        db.Index('ix_user_idea_likes_idea_id', 'idea_id'),
+    )
     
     # Relationships
     user = db.relationship('User')
@@ -237,24 +464,73 @@ class UserIdeaLike(db.Model):
         """Create a new like record"""
         like = cls(user_id=user_id, idea_id=idea_id)
         return like
-    def decrease_like(self, commit: bool = True):
-        """Decrement the idea's like_count by one and optionally commit to DB.
 
-        Returns the new like_count.
+    @classmethod
+    def add(cls, user_id, idea_id):
+        """Record a like with ``INSERT ... ON CONFLICT DO NOTHING``.
+
+        Returns True if the like was new, False if the user had already liked
+        the idea. Does not commit.
         """
-        try:
-            if self.like_count and self.like_count > 0:
-                self.like_count -= 1
-            if commit:
-                db.session.add(self)
-                db.session.commit()
-            return self.like_count
-        except Exception:
-            try:
-                db.session.rollback()
-            except Exception:
-                pass
-            raise
+        return _add_like_record(cls, 'unique_user_idea_like', user_id=user_id, idea_id=idea_id)
+
+    @classmethod
+    def remove(cls, user_id, idea_id):
+        """Delete a like in one statement.
+
+        Returns True if a like was removed, False if there was none. Does not commit.
+        """
+        return _remove_like_record(cls, user_id=user_id, idea_id=idea_id)
+
+    @classmethod
+    def liked_ids(cls, user_id, idea_ids=None):
+        """Return which of ``idea_ids`` (default: all ideas) the user has liked, as a set of UUIDs."""
+        return _liked_ids(cls.idea_id, cls.user_id, user_id, idea_ids)
+
+
+class UserProjectLike(db.Model):
+    """Track which users have liked which projects"""
+    __tablename__ = 'user_project_likes'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    project_id = db.Column(UUID(as_uuid=True), db.ForeignKey('projects.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Ensure a user can only like a project once
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'project_id', name='unique_user_project_like'),
+        db.Index('ix_user_project_likes_project_id', 'project_id'),
+    )
+    
+    # Relationships
+    user = db.relationship('User')
+    project = db.relationship('Project')
+    
+    def __repr__(self):
+        return f'<UserProjectLike user_id={self.user_id} project_id={self.project_id}>'
+
+    @classmethod
+    def add(cls, user_id, project_id):
+        """Record a like with ``INSERT ... ON CONFLICT DO NOTHING``.
+
+        Returns True if the like was new, False if the user had already liked
+        the project. Does not commit.
+        """
+        return _add_like_record(cls, 'unique_user_project_like', user_id=user_id, project_id=project_id)
+
+    @classmethod
+    def remove(cls, user_id, project_id):
+        """Delete a like in one statement.
+
+        Returns True if a like was removed, False if there was none. Does not commit.
+        """
+        return _remove_like_record(cls, user_id=user_id, project_id=project_id)
+
+    @classmethod
+    def liked_ids(cls, user_id, project_ids):
+        """Return which of ``project_ids`` the user has liked, as a set of UUIDs."""
+        return _liked_ids(cls.project_id, cls.user_id, user_id, project_ids)
         
 class Comment(db.Model):
     __tablename__ = 'comments'
@@ -266,6 +542,11 @@ class Comment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_comments_idea_id_created_at_id', 'idea_id', 'created_at', 'id'),
+        db.Index('ix_comments_user_id', 'user_id'),
+    )
+    
     # Relationships
     user = db.relationship('User', backref=db.backref('comments', lazy=True))
     idea = db.relationship('Idea', backref=db.backref('comments', lazy=True))
@@ -273,21 +554,15 @@ class Comment(db.Model):
     def __repr__(self):
         return f'<Comment {self.id} on idea {self.idea_id}>'
     
+    # Columns copied as-is by to_dict; UUIDs and datetimes are left to the JSON encoder
+    _serialized_columns = ('id', 'user_id', 'idea_id', 'content', 'created_at', 'updated_at')
+    
     def to_dict(self):
         """Convert comment object to dictionary for JSON serialization."""
-        return {
-            'id': str(self.id),
-            'user_id': str(self.user_id),
-            'idea_id': str(self.idea_id),
-            'content': self.content,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'user': {
-                'id': str(self.user.id),
-                'name': self.user.name,
-                'email': self.user.email
-            } if self.user else None
-        }
+        data = columns_dict(self, self._serialized_columns)
+        user = self.user
+        data['user'] = columns_dict(user, ('id', 'name', 'email')) if user else None
+        return data
     
     @classmethod
     def create(cls, user_id, idea_id, content):
@@ -0,0 +1,115 @@
+"""Pagination helpers.
+
+Keyset (cursor) pages are ordered by ``(created_at, id)`` newest first. Each
+page is fetched with a ``WHERE (created_at, id) < (:created_at, :id)``
+predicate that is served directly from a composite index, so unlike
+``paginate()`` there is no ``COUNT(*)`` and no OFFSET scan: every page costs
+the same at any depth.
+
+``approx_paginate`` keeps page numbers but replaces the exact ``COUNT(*)``
+with a known total (a maintained counter or the planner's ``reltuples``
+estimate) or a count that stops at a cap.
+"""
+import base64
+import json
+import math
+import uuid
+from datetime import datetime
+
+from app.models import db
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def encode_cursor(created_at, row_id):
+    """Encode a ``(created_at, id)`` position as an opaque URL-safe token."""
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token produced by ``encode_cursor`` back to ``(created_at, id)``."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token!r}") from e
+
+
+def keyset_page(query, model, cursor, limit):
+    """Fetch one newest-first page of ``query`` after ``cursor``.
+
+    ``cursor`` is the ``next_cursor`` of the previous page, or an empty
+    string/None for the first page. Returns ``(items, next_cursor)`` where
+    ``next_cursor`` is None on the last page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(db.tuple_(model.created_at, model.id) < db.tuple_(created_at, row_id))
+
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
+
+
+def estimated_row_count(model):
+    """Return Postgres' row estimate for ``model``'s table, or None if it was never analyzed."""
+    estimate = db.session.execute(
+        db.text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": model.__tablename__}
+    ).scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+def capped_count(query, cap):
+    """Count the rows of ``query``, stopping after ``cap``; returns ``(count, exact)``."""
+    subquery = query.order_by(None).limit(cap + 1).subquery()
+    count = db.session.query(db.func.count()).select_from(subquery).scalar()
+    return min(count, cap), count <= cap
+
+
+class ApproxPagination:
+    """The parts of Flask-SQLAlchemy's ``Pagination`` that the routes use, plus ``total_exact``."""
+
+    def __init__(self, items, page, per_page, total, total_exact, has_next):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.total_exact = total_exact
+        self.has_next = has_next
+        self.has_prev = page > 1
+        self.pages = math.ceil(total / per_page) if total else 0
+        self.next_num = page + 1 if has_next else None
+        self.prev_num = page - 1 if self.has_prev else None
+
+
+def approx_paginate(query, page, per_page, total=None, exact=False, cap=1000):
+    """Like ``query.paginate()``, without an exact ``COUNT(*)``.
+
+    ``total`` is a total the caller already knows (``exact`` says whether
+    it is a true count or an estimate). Without one, rows are counted up to
+    ``cap``. ``has_next`` is always exact because the page is fetched with
+    one extra row. Reaching the last page makes the total exact too.
+    """
+    offset = (page - 1) * per_page
+    items = query.limit(per_page + 1).offset(offset).all()
+    has_next = len(items) > per_page
+    items = items[:per_page]
+
+    if not has_next and (items or page == 1):
+        total, exact = offset + len(items), True
+    else:
+        if total is None:
+            total, exact = capped_count(query, cap)
+        # An estimate can't be below the rows we've just seen
+        if items:
+            total = max(total, offset + len(items) + (1 if has_next else 0))
+    return ApproxPagination(items, page, per_page, total, exact, has_next)
@@ -0,0 +1,108 @@
+"""Per-request SQL statement counts, DB time and slow-query logging.
+
+Cursor events on every engine (primary and replica) record, for the
+current request, how many statements ran, their total time and the
+slowest one. After the request:
+
+- a ``Server-Timing`` header carries them (``db`` with the statement count
+  in its description, ``db-slowest``, and ``app`` for the whole request),
+  unless ``SERVER_TIMING`` is off;
+- the request is logged when it ran more than ``SLOW_REQUEST_QUERIES``
+  statements or spent more than ``SLOW_REQUEST_DB_MS`` in the database,
+  and the slowest statement is logged when it took over ``SLOW_QUERY_MS``;
+- the numbers are added to the per-endpoint metrics served by ``/metrics``
+  (see app/metrics.py).
+
+Statements run outside a request (the like buffer's flush thread, CLI
+commands) are not counted.
+"""
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_START_KEY = 'query_stats_start'
+
+
+class RequestQueryStats:
+    """Statements run by one request."""
+
+    __slots__ = ('started', 'slow_threshold', 'count', 'db_time', 'slow_count', 'slowest_time', 'slowest_statement')
+
+    def __init__(self, slow_threshold):
+        self.started = time.perf_counter()
+        self.slow_threshold = slow_threshold
+        self.count = 0
+        self.db_time = 0.0
+        self.slow_count = 0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        if elapsed > self.slow_threshold:
+            self.slow_count += 1
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self):
+        total = (time.perf_counter() - self.started) * 1000
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.count} queries", '
+            f'db-slowest;dur={self.slowest_time * 1000:.2f}, '
+            f'app;dur={total:.2f}'
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_stats' in g:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if starts and has_request_context() and 'query_stats' in g:
+        g.query_stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def init_query_stats(app):
+    """Record SQL statements per request and report them to ``app.extensions["metrics"]``."""
+    server_timing = app.config.get('SERVER_TIMING', True)
+    slow_query = app.config.get('SLOW_QUERY_MS', 200) / 1000
+    slow_request_queries = app.config.get('SLOW_REQUEST_QUERIES', 25)
+    slow_request_db = app.config.get('SLOW_REQUEST_DB_MS', 500) / 1000
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = RequestQueryStats(slow_query)
+
+    @app.after_request
+    def finish_query_stats(response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+
+        if stats.slow_count:
+            app.logger.warning(
+                f"{stats.slow_count} slow queries in {endpoint}, slowest {stats.slowest_time * 1000:.1f} ms: "
+                f"{stats.slowest_statement[:500]}"
+            )
+        slow_request = stats.count > slow_request_queries or stats.db_time > slow_request_db
+        if slow_request:
+            app.logger.warning(
+                f"{request.method} {request.full_path} ran {stats.count} queries "
+                f"in {stats.db_time * 1000:.1f} ms"
+            )
+
+        app.extensions['metrics'].observe_queries(endpoint, stats, slow_request)
+        if server_timing:
+            response.headers['Server-Timing'] = stats.server_timing()
+        return response
@@ -0,0 +1,97 @@
+"""Read-replica routing.
+
+When ``SQLALCHEMY_BINDS`` has a ``replica`` entry, views decorated with
+``@read_replica`` send their ORM reads to that engine. Everything else
+stays on the primary: writes, flushes, raw ``text()`` statements and any
+view without the decorator.
+
+Replicas lag the primary slightly. A client that has just written
+something (liked an idea, posted a comment) is therefore pinned to the
+primary for ``REPLICA_STICKY_SECONDS``, so it always reads its own writes.
+The pin is a timestamp in the Flask session, set after any request that
+flushed changes or ran an INSERT/UPDATE/DELETE through the session.
+"""
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+
+REPLICA_BIND = 'replica'
+_STICKY_KEY = '_primary_until'
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to the replica while ``g.use_replica`` is set."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get('use_replica')
+            and (clause is None or isinstance(clause, Select))
+        ):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_enabled(app=None):
+    app = app or current_app
+    return REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {})
+
+
+def read_replica(f):
+    """Serve a read-only view from the replica unless the client is pinned to the primary."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.use_replica = replica_enabled() and session.get(_STICKY_KEY, 0) <= time.time()
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+@contextmanager
+def primary_reads():
+    """Send reads inside the block to the primary, even in a ``@read_replica`` view.
+
+    For results paired with collection versions (cached pages): the versions
+    are read from the primary, so data read from a lagging replica could be
+    stored under a version it doesn't match.
+    """
+    previous = g.get('use_replica', False)
+    g.use_replica = False
+    try:
+        yield
+    finally:
+        g.use_replica = previous
+
+
+def _mark_write(*args):
+    if has_request_context():
+        g.db_wrote = True
+
+
+def _mark_dml(orm_execute_state):
+    # INSERT/UPDATE/DELETE run through session.execute() never reach a flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write()
+
+
+def init_replica(app, db):
+    """Pin clients that write to the primary for ``REPLICA_STICKY_SECONDS``."""
+    if not replica_enabled(app):
+        return
+    if not event.contains(RoutingSession, 'after_flush', _mark_write):
+        event.listen(RoutingSession, 'after_flush', _mark_write)
+        event.listen(RoutingSession, 'do_orm_execute', _mark_dml)
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        if g.get('db_wrote') and response.status_code < 400:
+            session[_STICKY_KEY] = time.time() + app.config.get('REPLICA_STICKY_SECONDS', 5)
+        return response
@@ -1,5 +1,5 @@
-from app import app, supabase
-from flask import jsonify, request, session, send_file, current_app, redirect, url_for
+from flask import Blueprint, jsonify, request, session, send_file, current_app, redirect, url_for, g, has_app_context, Response
+from werkzeug.local import LocalProxy
 from pathlib import Path
 from typing import Any, Dict
 import uuid
@@ -8,7 +8,13 @@ from datetime import datetime
 from dotenv import load_dotenv
 from app.models import User, db
 from functools import wraps
-from app.models import Project, Idea, User, UserIdeaLike, Comment
+from sqlalchemy import event
+from app.models import Project, Idea, User, UserIdeaLike, UserProjectLike, Comment
+from app.pagination import InvalidCursor, approx_paginate, estimated_row_count, keyset_page
+from app.cache import CachedPayload, TTLCache, VersionedCache
+from app.db_pool import pool_status
+from app.replica import REPLICA_BIND, primary_reads, read_replica
+from app.versions import collection_versions, conditional
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -20,6 +26,15 @@ def _env(name, default=""):
 SUPABASE_URL = _env("SUPABASE_URL")
 FRONTEND_URL = _env("FRONTEND_URL", "https://devhub-murex.vercel.app/")
 
+bp = Blueprint("catalog", __name__)
+
+# Per-app state, created by init_app()
+token_verifier = LocalProxy(lambda: current_app.extensions["token_verifier"])
+
+def _supabase():
+    """Return the app's Supabase client (created on first use), or None when it isn't configured."""
+    return current_app.extensions["supabase"].get()
+
 def _extract(resp: Any, key: str):
     if resp is None:
         return None
@@ -40,10 +55,99 @@ def _extract(resp: Any, key: str):
         pass
     return None
 
+# Optional short-lived cache of each user's full liked-idea set (LIKED_IDS_CACHE_TTL > 0).
+# A user's own like/unlike on this worker invalidates it immediately.
+liked_ideas_cache = LocalProxy(lambda: current_app.extensions["liked_ideas_cache"])
+
+def _fetch_supabase_user(access_token):
+    """Ask Supabase Auth for the user behind ``access_token`` (network round-trip)."""
+    if _supabase() is None:
+        return None
+    user = _extract(_supabase().auth.get_user(access_token), "user")
+    if hasattr(user, "dict"):
+        try:
+            user = user.dict()
+        except Exception:
+            user = dict(user.__dict__) if hasattr(user, "__dict__") else user
+    return user
+
+def _get_auth_user(access_token):
+    """Resolve an access token to a user dict, verifying it locally when possible."""
+    return token_verifier.get_user(access_token, _fetch_supabase_user)
+
+def _annotate_liked_ideas(ideas, liked=None):
+    """Add a ``liked_by_me`` flag to serialized ideas, in place.
+
+    ``liked`` forces the flag (e.g. for the ``liked=true`` filter). Otherwise
+    the viewer's likes for the whole page come from one ``IN (...)`` query,
+    or from ``liked_ideas_cache`` when it is enabled.
+    """
+    if liked is None:
+        user = current_user()
+        user_id = user.id if user else None
+        liked_ids = None
+        if user_id and ideas:
+            liked_ids = liked_ideas_cache.get(user_id)
+            if liked_ids is None and liked_ideas_cache.ttl > 0:
+                liked_ids = UserIdeaLike.liked_ids(user_id)
+                liked_ideas_cache.set(user_id, liked_ids)
+        if liked_ids is None:
+            liked_ids = UserIdeaLike.liked_ids(user_id, [idea["id"] for idea in ideas])
+        # Cached pages carry ids as strings, fresh ones as UUIDs
+        liked_ids = {str(idea_id) for idea_id in liked_ids}
+    for idea in ideas:
+        idea["liked_by_me"] = liked if liked is not None else str(idea["id"]) in liked_ids
+    return ideas
+
+def _annotate_liked_projects(projects):
+    """Return copies of serialized projects with a ``liked_by_me`` flag.
+
+    The viewer's likes for the whole list are resolved with a single
+    ``IN (...)`` query; anonymous viewers get ``False`` everywhere.
+    """
+    user = current_user()
+    liked = UserProjectLike.liked_ids(user.id if user else None, [p["id"] for p in projects])
+    return [{**p, "liked_by_me": p["id"] in liked} for p in projects]
+
+# Per-process LRU of logged-in users keyed by Supabase auth_id. Entries are
+# UserSnapshot tuples, never ORM instances. Any ORM update or delete of a
+# User in this process evicts its entry; other workers catch up within the TTL.
+user_cache = LocalProxy(lambda: current_app.extensions["user_cache"])
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_cached_user(mapper, connection, target):
+    if has_app_context() and "user_cache" in current_app.extensions:
+        user_cache.pop(str(target.auth_id))
+
+def current_user():
+    """Return the logged-in user as a ``UserSnapshot``, or None.
+
+    Resolved at most once per request (memoized on ``flask.g``) and usually
+    served from ``user_cache``, so it costs one indexed lookup at most.
+    Note that ``session["user_id"]`` holds the Supabase auth_id; use the
+    snapshot's ``id`` for foreign keys to ``users``.
+    """
+    if "current_user" in g:
+        return g.current_user
+    auth_id = session.get("user_id")
+    user = None
+    if auth_id:
+        auth_id = str(auth_id)
+        user = user_cache.get(auth_id)
+        if user is None:
+            row = User.query.filter_by(auth_id=auth_id).first()
+            if row is not None:
+                user = row.snapshot()
+                user_cache.set(auth_id, user)
+    g.current_user = user
+    return user
+
 def login_required(f):
+    """Require a logged-in user with a local account; exposes it as ``g.current_user``."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if "user_id" not in session:
+        if "user_id" not in session or current_user() is None:
             return jsonify({
                 "status": 401, 
                 "detail": "Authentication required",
@@ -53,7 +157,7 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-@app.route("/auth/status", methods=["GET"])
+@bp.route("/auth/status", methods=["GET"])
 def auth_status():
     """Check if user is authenticated and return user info."""
     if "user_id" not in session:
@@ -65,7 +169,7 @@ def auth_status():
     
     try:
         user_id = session["user_id"]
-        user = User.query.filter_by(auth_id=user_id).first()
+        user = current_user()
         
         return jsonify({
             "status": 200,
@@ -85,9 +189,9 @@ def auth_status():
             "user": None
         }), 200
 
-@app.route("/login", methods=["POST"])
+@bp.route("/login", methods=["POST"])
 def login():
-    if supabase is None:
+    if _supabase() is None:
         return jsonify({"status": 500, "detail": "Server not configured: missing Supabase keys"}), 500
 
     data = request.get_json(silent=True) or {}
@@ -98,7 +202,7 @@ def login():
         return jsonify({"status": 400, "detail": "email and password are required"}), 400
 
     try:
-        resp = supabase.auth.sign_in_with_password({"email": email, "password": password})
+        resp = _supabase().auth.sign_in_with_password({"email": email, "password": password})
 
         # extract error/user/session for different SDK shapes
         error = _extract(resp, "error")
@@ -158,10 +262,10 @@ def login():
         return jsonify({"status": 500, "detail": "Unexpected server error", "error": str(e)}), 500
 
 
-@app.route("/signup", methods=["POST"])
+@bp.route("/signup", methods=["POST"])
 def signup():
     """Sign up a new user with email and password."""
-    if supabase is None:
+    if _supabase() is None:
         return jsonify({"status": 500, "detail": "Server not configured: missing Supabase keys"}), 500
 
     data = request.get_json(silent=True) or {}
@@ -174,7 +278,7 @@ def signup():
 
     try:
         # Sign up with Supabase
-        resp = supabase.auth.sign_up({"email": email, "password": password})
+        resp = _supabase().auth.sign_up({"email": email, "password": password})
 
         # Extract error/user/session
         error = _extract(resp, "error")
@@ -234,7 +338,7 @@ def signup():
         return jsonify({"status": 500, "detail": "Unexpected server error", "error": str(e)}), 500
 
 
-@app.route("/login", methods=["GET"])
+@bp.route("/login", methods=["GET"])
 def login_page():
     """Serve the frontend login page for manual testing."""
     # Try multiple possible paths for the frontend/login.html file
@@ -275,7 +379,7 @@ def login_page():
     }), 404
 
 
-@app.route("/auth/google", methods=["GET"])
+@bp.route("/auth/google", methods=["GET"])
 def google_oauth():
     """Redirect to Supabase Google OAuth"""
     try:
@@ -288,7 +392,7 @@ def google_oauth():
     except Exception as e:
         return redirect(f"/login?error=OAuth initialization failed: {str(e)}")
 
-@app.route("/auth/callback", methods=["GET"])  
+@bp.route("/auth/callback", methods=["GET"])  
 def oauth_callback():
     """Handle OAuth callback and redirect to frontend"""
     try:
@@ -305,17 +409,9 @@ def oauth_callback():
         if access_token:
             # Process the OAuth tokens
             try:
-                user_response = supabase.auth.get_user(access_token)
-                user = _extract(user_response, "user")
+                user = _get_auth_user(access_token)
                 
                 if user:
-                    # Normalize user data
-                    if hasattr(user, "dict"):
-                        try:
-                            user = user.dict()
-                        except Exception:
-                            user = dict(user.__dict__) if hasattr(user, "__dict__") else user
-                    
                     # Create session
                     session.clear()
                     session["user_id"] = user.get("id")
@@ -353,19 +449,19 @@ def oauth_callback():
         current_app.logger.error(f"OAuth callback failed: {e}")
         return redirect(f"http://localhost:3000/?error=Authentication failed")
 
-@app.route("/auth/google/callback", methods=["GET"])
+@bp.route("/auth/google/callback", methods=["GET"])
 def google_callback():
     """Legacy route - redirect to main callback"""
     return oauth_callback()
 
 
-@app.route("/auth/logout", methods=["POST", "GET"])
+@bp.route("/auth/logout", methods=["POST", "GET"])
 def logout():
     """Log out the current user."""
     try:
-        if supabase:
+        if _supabase():
             # Sign out from Supabase
-            supabase.auth.sign_out()
+            _supabase().auth.sign_out()
         
         # Clear Flask session
         session.clear()
@@ -373,17 +469,17 @@ def logout():
         if request.method == "POST":
             return jsonify({"status": 200, "message": "Logged out successfully"}), 200
         else:
-            return redirect(url_for('login_page'))
+            return redirect(url_for('catalog.login_page'))
             
     except Exception as e:
         current_app.logger.error(f"Logout failed: {e}")
         if request.method == "POST":
             return jsonify({"status": 500, "detail": "Logout failed", "error": str(e)}), 500
         else:
-            return redirect(url_for('login_page') + '?error=logout_failed')
+            return redirect(url_for('catalog.login_page') + '?error=logout_failed')
 
 
-@app.route("/auth/process-oauth", methods=["POST"])
+@bp.route("/auth/process-oauth", methods=["POST"])
 def process_oauth():
     """Process OAuth tokens sent from frontend JavaScript"""
     try:
@@ -394,18 +490,10 @@ def process_oauth():
         if not access_token:
             return jsonify({"status": 400, "detail": "No access token provided"}), 400
         
-        # Use the access token to get user info from Supabase
-        user_response = supabase.auth.get_user(access_token)
-        auth_user = _extract(user_response, "user")
+        # Verify the access token (locally when possible, cached per token)
+        auth_user = _get_auth_user(access_token)
         
         if auth_user:
-            # Normalize user data
-            if hasattr(auth_user, "dict"):
-                try:
-                    auth_user = auth_user.dict()
-                except Exception:
-                    auth_user = dict(auth_user.__dict__) if hasattr(auth_user, "__dict__") else auth_user
-            
             # Extract user information
             auth_id = auth_user.get("id")
             email = auth_user.get("email")
@@ -480,32 +568,44 @@ def process_oauth():
         current_app.logger.error(f"OAuth processing failed: {e}")
         return jsonify({"status": 500, "detail": "OAuth processing failed", "error": str(e)}), 500
 
-@app.route('/submit',methods=['POST'])
+@bp.route('/submit',methods=['POST'])
 @login_required
 def submit_project():
-    """Submit a new project."""
+    """Submit a new project implementing an idea."""
     data = request.get_json() or {}
+    idea_id = str(data.get("idea_id") or "").strip()
     title = (data.get("title") or "").strip()
     description = (data.get("description") or "").strip()
     repo_url = (data.get("repo_url") or "").strip()
     live_url = (data.get("live_url") or "").strip() or None
     tags = data.get("tags") or []
     
-    if not title or not description or not repo_url:
-        return jsonify({"status": 400, "detail": "title, description, and repo_url are required"}), 400
+    if not idea_id or not title or not description or not repo_url:
+        return jsonify({"status": 400, "detail": "idea_id, title, description, and repo_url are required"}), 400
 
     try:
-        user_id = session["user_id"]
+        idea_id = uuid.UUID(idea_id)
+    except ValueError:
+        return jsonify({"status": 400, "detail": "idea_id must be a valid UUID"}), 400
+
+    try:
+        if db.session.query(Idea.id).filter_by(id=idea_id).first() is None:
+            return jsonify({"status": 404, "detail": "Idea not found"}), 404
+        
+        user_id = g.current_user.id
         new_project = Project.create(
             title=title,
             description=description,
             repo_url=repo_url,
             live_url=live_url,
             tags=tags,
-            user_id=user_id
+            user_id=user_id,
+            idea_id=idea_id
         )
         db.session.add(new_project)
+        Idea.adjust_counts(idea_id, projects=1)
         db.session.commit()
+        featured_projects_cache.invalidate()
         
         return jsonify({
             "status": 201,
@@ -518,7 +618,8 @@ def submit_project():
                 "live_url": new_project.live_url,
                 "tags": new_project.tags,
                 "created_at": new_project.created_at.isoformat(),
-                "user_id": str(new_project.user_id)
+                "user_id": str(new_project.user_id),
+                "idea_id": str(new_project.idea_id)
             }
         }), 201
 
@@ -530,14 +631,15 @@ def submit_project():
         current_app.logger.error(f"Project submission failed: {e}")
         return jsonify({"status": 500, "detail": "Project submission failed", "error": str(e)}), 500
 
-@app.route("/user/<uuid:user_id>", methods=["GET"])
+@bp.route("/user/<uuid:user_id>", methods=["GET"])
 @login_required
+@read_replica
 def profile(user_id):
     """Get all projects submitted by a user."""
     user=User.query.filter_by(id=user_id).first()
     if not user:
         return jsonify({"status": 404, "detail": "User not found"}), 404
-    projects = Project.query.filter_by(user_id=user_id).all()
+    projects = Project.query.options(db.joinedload(Project.user)).filter_by(user_id=user_id).all()
     return jsonify({
         "status": 200,
         "user": {
@@ -545,21 +647,52 @@ def profile(user_id):
             "email": user.email,
             "name": user.name,
             "github_username": user.github_username,
-            "avatar_url": user.avatar_url
+            "avatar_url": None  # not stored locally yet
         },
-        "projects": [project.to_dict() for project in projects]
+        "projects": _annotate_liked_projects([project.to_dict() for project in projects])
     }), 200
 
-@app.route('/home', methods=['GET'])
-def featured_projects():
-    """Get featured projects."""
-    projects = Project.query.order_by(Project.like_count.desc()).limit(6).all()
-    return jsonify({
+def _build_featured_projects():
+    """Build the /home payload: the six most-liked projects."""
+    projects = (
+        Project.query.options(db.joinedload(Project.user))
+        .order_by(Project.like_count.desc())
+        .limit(6)
+        .all()
+    )
+    return {
         "status": 200,
-        "projects": [project.to_dict() for project in projects]
-    }), 200
+        "projects": [{**project.to_dict(), "liked_by_me": False} for project in projects]
+    }
 
-@app.route('/ideas', methods=['GET'])
+# The ranking only changes when projects are liked or submitted, so the
+# serialized payload is cached and invalidated by those routes.
+featured_projects_cache = LocalProxy(lambda: current_app.extensions["featured_projects_cache"])
+
+# /ideas pages (before liked_by_me), keyed by the ideas/users versions and the
+# normalized query, so any write to ideas, likes or authors retires old entries
+ideas_cache = LocalProxy(lambda: current_app.extensions["ideas_cache"])
+
+@bp.route('/home', methods=['GET'])
+@read_replica
+@conditional('projects', 'users', anonymous=False)
+def featured_projects():
+    """Get featured projects.
+
+    Anonymous visitors get the shared cached body; logged-in users get a
+    copy annotated with ``liked_by_me``.
+    """
+    if current_user() is None:
+        return featured_projects_cache.response()
+    payload = featured_projects_cache.get_data()
+    response = jsonify({**payload, "projects": _annotate_liked_projects(payload["projects"])})
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response, 200
+
+@bp.route('/ideas', methods=['GET'])
+@read_replica
+@conditional('ideas', 'users')
 def list_ideas():
     """Get ideas with pagination and filtering support.
     
@@ -568,6 +701,17 @@ def list_ideas():
     - limit: Items per page (default: 10, max: 50)
     - difficulty: Filter by difficulty (easy, medium, hard)
     - liked: Filter ideas liked by current user (true/false)
+    - search: Full-text search over title, description and solution;
+      matches are ordered by relevance, then newest first
+    - cursor: Opt into keyset pagination. Pass an empty value for the first
+      page and the returned ``next_cursor`` afterwards. Cursor pages are
+      always newest first, skip the total count and ignore ``page``.
+    - approx_total: With ``true``, ``total_items``/``total_pages`` come from
+      the table statistics (unfiltered) or a count capped at
+      ``APPROX_COUNT_CAP`` (filtered); ``pagination.total_exact`` says which.
+    
+    Each idea carries ``liked_by_me`` for the current user (False when
+    logged out).
     """
     try:
         # Get query parameters with defaults
@@ -575,6 +719,9 @@ def list_ideas():
         limit = request.args.get('limit', 10, type=int)
         difficulty = request.args.get('difficulty', type=str)
         liked_param = request.args.get('liked', type=str)
+        search = (request.args.get('search', type=str) or '').strip()
+        cursor = request.args.get('cursor', type=str)
+        approx_total = (request.args.get('approx_total', type=str) or '').lower() == 'true'
         
         # Validate parameters
         if page < 1:
@@ -582,17 +729,20 @@ def list_ideas():
         if limit < 1 or limit > 50:
             limit = 10
             
-        # Build query
-        query = Idea.query
+        # Build query (authors are joined in so serializing needs no extra queries)
+        query = Idea.with_author()
         
         # Apply difficulty filter
+        filtered = bool(search)
         if difficulty and difficulty.lower() in ['easy', 'medium', 'hard']:
             query = query.filter(Idea.difficulty == difficulty.lower())
+            filtered = True
         
         # Apply liked filter (ideas liked by current user)
-        if liked_param and liked_param.lower() == 'true':
+        only_liked = bool(liked_param and liked_param.lower() == 'true')
+        if only_liked:
             # Check if user is logged in
-            if 'user_id' not in session:
+            if current_user() is None:
                 return jsonify({
                     "status": 401, 
                     "detail": "Authentication required to filter liked ideas",
@@ -600,25 +750,50 @@ def list_ideas():
                     "requires_auth": True
                 }), 401
             
-            user_id = session['user_id']
+            user_id = g.current_user.id
             # Join with UserIdeaLike table to get only liked ideas
             query = query.join(UserIdeaLike).filter(UserIdeaLike.user_id == user_id)
         
-        # Order by creation date (newest first)
-        query = query.order_by(Idea.created_at.desc())
+        # Apply full-text search (ranked by relevance, except in cursor mode)
+        if search:
+            query = Idea.search(query, search, ranked=cursor is None)
         
-        # Apply pagination
-        paginated_ideas = query.paginate(
-            page=page,
-            per_page=limit,
-            error_out=False
-        )
+        filters = {
+            "difficulty": difficulty,
+            "liked": liked_param,
+            "search": search or None
+        }
         
-        # Build response
-        response_data = {
-            "status": 200,
-            "ideas": [idea.to_dict() for idea in paginated_ideas.items],
-            "pagination": {
+        def build_page():
+            # Keyset pagination: no COUNT(*), constant cost at any depth
+            if cursor is not None:
+                ideas, next_cursor = keyset_page(query, Idea, cursor, limit)
+                return {
+                    "ideas": Idea.to_dict_many(ideas),
+                    "pagination": {
+                        "limit": limit,
+                        "cursor": cursor or None,
+                        "next_cursor": next_cursor,
+                        "has_next": next_cursor is not None
+                    }
+                }
+            
+            # Order by creation date (newest first), then paginate
+            ordered = query.order_by(Idea.created_at.desc())
+            if approx_total:
+                unfiltered = not filtered and not only_liked
+                paginated_ideas = approx_paginate(
+                    ordered, page, limit,
+                    total=estimated_row_count(Idea) if unfiltered else None,
+                    cap=current_app.config.get("APPROX_COUNT_CAP", 1000)
+                )
+            else:
+                paginated_ideas = ordered.paginate(
+                    page=page,
+                    per_page=limit,
+                    error_out=False
+                )
+            pagination = {
                 "page": page,
                 "limit": limit,
                 "total_pages": paginated_ideas.pages,
@@ -627,15 +802,46 @@ def list_ideas():
                 "has_prev": paginated_ideas.has_prev,
                 "next_page": paginated_ideas.next_num if paginated_ideas.has_next else None,
                 "prev_page": paginated_ideas.prev_num if paginated_ideas.has_prev else None
-            },
-            "filters": {
-                "difficulty": difficulty,
-                "liked": liked_param
             }
-        }
+            if approx_total:
+                pagination["total_exact"] = paginated_ideas.total_exact
+            return {
+                "ideas": Idea.to_dict_many(paginated_ideas.items),
+                "pagination": pagination
+            }
         
-        return jsonify(response_data), 200
+        # Pages filtered by the viewer's own likes are not shared, so not cached.
+        # Uncached pages are built where the request was routed (maybe the replica).
+        versions = None
+        if not only_liked and ideas_cache.enabled:
+            try:
+                versions = collection_versions.get(("ideas", "users"))
+            except Exception as e:
+                current_app.logger.error(f"Collection versions unavailable, not caching /ideas: {e}")
+        if versions is None:
+            page_data = build_page()
+        else:
+            params = (
+                f"page={page if cursor is None else ''}&limit={limit}"
+                f"&difficulty={difficulty.lower() if difficulty else ''}"
+                f"&search={' '.join(search.lower().split())}&cursor={cursor}&approx={approx_total}"
+            )
+            # Built from the primary so a lagging replica's page is never stored under the new version
+            with primary_reads():
+                page_data = ideas_cache.get_or_build(f"{versions['ideas']}.{versions['users']}", params, build_page)
+        
+        return jsonify({
+            "status": 200,
+            "ideas": _annotate_liked_ideas(
+                [dict(idea) for idea in page_data["ideas"]],
+                liked=True if only_liked else None
+            ),
+            "pagination": page_data["pagination"],
+            "filters": filters
+        }), 200
         
+    except InvalidCursor as e:
+        return jsonify({"status": 400, "detail": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Failed to fetch ideas: {e}")
         return jsonify({
@@ -644,17 +850,26 @@ def list_ideas():
             "error": str(e)
         }), 500
 
-@app.route('/ideas/<uuid:idea_id>', methods=['GET'])
+@bp.route('/ideas/<uuid:idea_id>', methods=['GET'])
+@read_replica
 def get_idea(idea_id):
     """Get a specific idea by ID."""
-    idea = Idea.query.filter_by(id=idea_id).first()
+    idea = Idea.with_author().filter_by(id=idea_id).first()
     if not idea:
         return jsonify({"status": 404, "detail": "Idea not found"}), 404
-    return jsonify({"status": 200, "idea": idea.to_dict()}), 200
+    return jsonify({"status": 200, "idea": _annotate_liked_ideas(Idea.to_dict_many([idea]))[0]}), 200
 
-@app.route('/ideas/<uuid:idea_id>/comments', methods=['GET'])
+@bp.route('/ideas/<uuid:idea_id>/comments', methods=['GET'])
+@read_replica
+@conditional('comments', 'ideas', 'users')
 def get_idea_comments(idea_id):
-    """Get all comments for a specific idea."""
+    """Get all comments for a specific idea.
+
+    Supports ``page``/``limit`` pagination, or keyset pagination via
+    ``cursor`` (empty for the first page, then the returned ``next_cursor``).
+    With ``approx_total=true`` the total comes from the idea's maintained
+    ``comment_count`` instead of a ``COUNT(*)``.
+    """
     try:
         # First check if the idea exists
         idea = Idea.query.filter_by(id=idea_id).first()
@@ -664,6 +879,8 @@ def get_idea_comments(idea_id):
         # Get query parameters for pagination
         page = request.args.get('page', 1, type=int)
         limit = request.args.get('limit', 20, type=int)
+        cursor = request.args.get('cursor', type=str)
+        approx_total = (request.args.get('approx_total', type=str) or '').lower() == 'true'
         
         # Validate parameters
         if page < 1:
@@ -671,15 +888,40 @@ def get_idea_comments(idea_id):
         if limit < 1 or limit > 100:
             limit = 20
         
+        # Keyset pagination: no COUNT(*), constant cost at any depth
+        if cursor is not None:
+            comments, next_cursor = keyset_page(
+                Comment.query.options(db.joinedload(Comment.user)).filter_by(idea_id=idea_id), Comment, cursor, limit
+            )
+            return jsonify({
+                "status": 200,
+                "idea_id": str(idea_id),
+                "idea_title": idea.title,
+                "comments": [comment.to_dict() for comment in comments],
+                "pagination": {
+                    "limit": limit,
+                    "cursor": cursor or None,
+                    "next_cursor": next_cursor,
+                    "has_next": next_cursor is not None
+                }
+            }), 200
+        
         # Query comments for this idea, ordered by creation date (newest first)
-        comments_query = Comment.query.filter_by(idea_id=idea_id).order_by(Comment.created_at.desc())
+        comments_query = (
+            Comment.query.options(db.joinedload(Comment.user))
+            .filter_by(idea_id=idea_id)
+            .order_by(Comment.created_at.desc())
+        )
         
         # Apply pagination
-        paginated_comments = comments_query.paginate(
-            page=page,
-            per_page=limit,
-            error_out=False
-        )
+        if approx_total:
+            paginated_comments = approx_paginate(comments_query, page, limit, total=idea.comment_count, exact=True)
+        else:
+            paginated_comments = comments_query.paginate(
+                page=page,
+                per_page=limit,
+                error_out=False
+            )
         
         # Build response
         response_data = {
@@ -698,9 +940,13 @@ def get_idea_comments(idea_id):
                 "prev_page": paginated_comments.prev_num if paginated_comments.has_prev else None
             }
         }
+        if approx_total:
+            response_data["pagination"]["total_exact"] = paginated_comments.total_exact
         
         return jsonify(response_data), 200
         
+    except InvalidCursor as e:
+        return jsonify({"status": 400, "detail": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Failed to fetch comments for idea {idea_id}: {e}")
         return jsonify({
@@ -709,7 +955,7 @@ def get_idea_comments(idea_id):
             "error": str(e)
         }), 500
 
-@app.route('/ideas/<uuid:idea_id>/comments', methods=['POST'])
+@bp.route('/ideas/<uuid:idea_id>/comments', methods=['POST'])
 @login_required
 def create_comment(idea_id):
     """Create a new comment on an idea."""
@@ -727,7 +973,7 @@ def create_comment(idea_id):
             return jsonify({"status": 400, "detail": "Comment content is required"}), 400
         
         # Get current user
-        user_id = session["user_id"]
+        user_id = g.current_user.id
         
         # Create new comment
         new_comment = Comment.create(
@@ -737,6 +983,7 @@ def create_comment(idea_id):
         )
         
         db.session.add(new_comment)
+        Idea.adjust_counts(idea_id, comments=1)
         db.session.commit()
         
         return jsonify({
@@ -757,41 +1004,40 @@ def create_comment(idea_id):
             "error": str(e)
         }), 500
 
-@app.route('/ideas/<uuid:idea_id>/like', methods=['POST'])
+@bp.route('/ideas/<uuid:idea_id>/like', methods=['POST'])
 @login_required
 def like_idea(idea_id):
     """Increment like_count for an idea and track user like."""
     try:
-        idea = Idea.query.filter_by(id=idea_id).first()
+        idea = Idea.with_author().filter_by(id=idea_id).first()
         if not idea:
             return jsonify({"status": 404, "detail": "Idea not found"}), 404
         
-        user_id = session['user_id']
+        user_id = g.current_user.id
         
-        # Check if user has already liked this idea
-        existing_like = UserIdeaLike.query.filter_by(user_id=user_id, idea_id=idea_id).first()
-        if existing_like:
+        # Create like record; a conflict means the user already liked this idea
+        if not UserIdeaLike.add(user_id=user_id, idea_id=idea_id):
+            db.session.rollback()
             return jsonify({
                 "status": 400, 
                 "detail": "You have already liked this idea",
-                "idea": idea.to_dict()
+                "idea": _annotate_liked_ideas(Idea.to_dict_many([idea]), liked=True)[0]
             }), 400
         
-        # Create like record
-        user_like = UserIdeaLike.create(user_id=user_id, idea_id=idea_id)
-        db.session.add(user_like)
-        
-        # Increment like count
+        # Increment like count atomically in SQL
         new_count = idea.increase_like(commit=False)  # Don't commit yet
+        idea_data = _annotate_liked_ideas(Idea.to_dict_many([idea]), liked=True)[0]
+        idea_data["like_count"] = new_count
         
         # Commit both operations together
         db.session.commit()
+        liked_ideas_cache.pop(user_id)
         
         return jsonify({
             "status": 200, 
             "message": "Like added", 
             "like_count": new_count, 
-            "idea": idea.to_dict()
+            "idea": idea_data
         }), 200
         
     except Exception as e:
@@ -803,54 +1049,112 @@ def like_idea(idea_id):
         return jsonify({"status": 500, "detail": "Failed to like idea", "error": str(e)}), 500
 
 
-@app.route('/projects/<uuid:project_id>/like', methods=['POST'])
+@bp.route('/projects/<uuid:project_id>/like', methods=['POST'])
 @login_required
 def like_project(project_id):
-    """Increment like_count for a project."""
+    """Increment like_count for a project and track user like."""
     try:
-        project = Project.query.filter_by(id=project_id).first()
+        project = Project.query.options(db.joinedload(Project.user)).filter_by(id=project_id).first()
         if not project:
             return jsonify({"status": 404, "detail": "Project not found"}), 404
-        new_count = project.increase_like()
-        return jsonify({"status": 200, "message": "Like added", "like_count": new_count, "project": project.to_dict()}), 200
+        
+        user_id = g.current_user.id
+        
+        # Create like record; a conflict means the user already liked this project
+        if not UserProjectLike.add(user_id=user_id, project_id=project_id):
+            db.session.rollback()
+            return jsonify({
+                "status": 400,
+                "detail": "You have already liked this project",
+                "project": {**project.to_dict(), "liked_by_me": True}
+            }), 400
+        
+        new_count = project.increase_like(commit=False)  # Don't commit yet
+        project_data = {**project.to_dict(), "like_count": new_count, "liked_by_me": True}
+        
+        # Commit both operations together
+        db.session.commit()
+        featured_projects_cache.invalidate()
+        
+        return jsonify({"status": 200, "message": "Like added", "like_count": new_count, "project": project_data}), 200
     except Exception as e:
+        try:
+            db.session.rollback()
+        except:
+            pass
         current_app.logger.error(f"Failed to like project: {e}")
         return jsonify({"status": 500, "detail": "Failed to like project", "error": str(e)}), 500
 
-@app.route('/ideas/<uuid:idea_id>/like', methods=['DELETE'])
+@bp.route('/projects/<uuid:project_id>/like', methods=['DELETE'])
+@login_required
+def unlike_project(project_id):
+    """Decrement like_count for a project and remove user like."""
+    try:
+        project = Project.query.options(db.joinedload(Project.user)).filter_by(id=project_id).first()
+        if not project:
+            return jsonify({"status": 404, "detail": "Project not found"}), 404
+        
+        user_id = g.current_user.id
+        
+        # Remove like record; nothing deleted means the user hadn't liked it
+        if not UserProjectLike.remove(user_id=user_id, project_id=project_id):
+            db.session.rollback()
+            return jsonify({
+                "status": 400,
+                "detail": "You haven't liked this project yet",
+                "project": {**project.to_dict(), "liked_by_me": False}
+            }), 400
+        
+        new_count = project.decrease_like(commit=False)  # Don't commit yet
+        project_data = {**project.to_dict(), "like_count": new_count, "liked_by_me": False}
+        
+        # Commit both operations together
+        db.session.commit()
+        featured_projects_cache.invalidate()
+        
+        return jsonify({"status": 200, "message": "Like removed", "like_count": new_count, "project": project_data}), 200
+    except Exception as e:
+        try:
+            db.session.rollback()
+        except:
+            pass
+        current_app.logger.error(f"Failed to unlike project: {e}")
+        return jsonify({"status": 500, "detail": "Failed to unlike project", "error": str(e)}), 500
+
+@bp.route('/ideas/<uuid:idea_id>/like', methods=['DELETE'])
 @login_required
 def unlike_idea(idea_id):
     """Decrement like_count for an idea and remove user like."""
     try:
-        idea = Idea.query.filter_by(id=idea_id).first()
+        idea = Idea.with_author().filter_by(id=idea_id).first()
         if not idea:
             return jsonify({"status": 404, "detail": "Idea not found"}), 404
         
-        user_id = session['user_id']
+        user_id = g.current_user.id
         
-        # Check if user has liked this idea
-        existing_like = UserIdeaLike.query.filter_by(user_id=user_id, idea_id=idea_id).first()
-        if not existing_like:
+        # Remove like record; nothing deleted means the user hadn't liked it
+        if not UserIdeaLike.remove(user_id=user_id, idea_id=idea_id):
+            db.session.rollback()
             return jsonify({
                 "status": 400, 
                 "detail": "You haven't liked this idea yet",
-                "idea": idea.to_dict()
+                "idea": _annotate_liked_ideas(Idea.to_dict_many([idea]), liked=False)[0]
             }), 400
         
-        # Remove like record
-        db.session.delete(existing_like)
-        
-        # Decrement like count
+        # Decrement like count atomically in SQL
         new_count = idea.decrease_like(commit=False)  # Don't commit yet
+        idea_data = _annotate_liked_ideas(Idea.to_dict_many([idea]), liked=False)[0]
+        idea_data["like_count"] = new_count
         
         # Commit both operations together
         db.session.commit()
+        liked_ideas_cache.pop(user_id)
         
         return jsonify({
             "status": 200, 
             "message": "Like removed", 
             "like_count": new_count, 
-            "idea": idea.to_dict()
+            "idea": idea_data
         }), 200
         
     except Exception as e:
@@ -861,32 +1165,49 @@ def unlike_idea(idea_id):
         current_app.logger.error(f"Failed to unlike idea: {e}")
         return jsonify({"status": 500, "detail": "Failed to unlike idea", "error": str(e)}), 500
 
-@app.route('/health', methods=['GET'])
+@bp.route('/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the worker is up and serving. Never touches the database."""
+    return jsonify({"status": "alive"}), 200
+
+@bp.route('/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: the latest background check (see app/health.py); 503 when not ready."""
+    report = current_app.extensions["readiness"].get()
+    return jsonify(report), 200 if report["ready"] else 503
+
+@bp.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint for monitoring and load balancers."""
-    try:
-        # Test database connection
-        db.session.execute('SELECT 1')
-        
-        return jsonify({
-            "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "1.0.0",
-            "database": "connected",
-            "services": {
-                "database": "ok",
-                "authentication": "ok" if supabase else "disabled"
-            }
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            "status": "unhealthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "error": str(e)
-        }), 503
+    """Detailed health for humans and dashboards, built from the cached readiness report."""
+    report = current_app.extensions["readiness"].get()
+    ready = report["ready"]
+    return jsonify({
+        "status": "healthy" if ready else "unhealthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "version": "1.0.0",
+        "database": "connected" if report["checks"]["database"]["status"] == "ok" else "unreachable",
+        "services": {
+            "database": report["checks"]["database"]["status"],
+            "authentication": report["checks"]["supabase"]["status"]
+        },
+        "readiness": report,
+        "database_pool": pool_status(db.engine),
+        "replica_pool": pool_status(db.engines[REPLICA_BIND]) if REPLICA_BIND in db.engines else None,
+        "ideas_cache": ideas_cache.stats()
+    }), 200 if ready else 503
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Request, SQL, pool and cache metrics in Prometheus text format.
 
-@app.route('/', methods=['GET'])
+    Merged over all workers when ``METRICS_DIR`` is set (see app/metrics.py).
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return jsonify({"status": 401, "detail": "Invalid metrics token"}), 401
+    return Response(current_app.extensions["metrics"].render(), mimetype="text/plain; version=0.0.4")
+
+@bp.route('/', methods=['GET'])
 def root():
     """Root endpoint - API information."""
     return jsonify({
@@ -895,6 +1216,8 @@ def root():
         "description": "API for managing project ideas and implementations",
         "endpoints": {
             "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
             "ideas": "/ideas",
             "auth": "/auth/status",
             "documentation": "/docs"
@@ -902,11 +1225,32 @@ def root():
         "status": "running"
     }), 200
 
-@app.route('/project/<uuid:project_id>', methods=['GET'])
+@bp.route('/project/<uuid:project_id>', methods=['GET'])
+@read_replica
 def get_project(project_id):
     """Get project details by ID."""
-    project = Project.query.filter_by(id=project_id).first()
+    project = Project.query.options(db.joinedload(Project.user)).filter_by(id=project_id).first()
     if not project:
         return jsonify({"status": 404, "detail": "Project not found"}), 404
-    return jsonify({"status": 200, "project": project.to_dict()}), 200
+    return jsonify({"status": 200, "project": _annotate_liked_projects([project.to_dict()])[0]}), 200
 
+def init_app(app):
+    """Create the per-app caches and register the routes on ``app``."""
+    app.extensions["liked_ideas_cache"] = TTLCache(maxsize=4096, ttl=app.config.get("LIKED_IDS_CACHE_TTL", 0))
+    app.extensions["user_cache"] = TTLCache(
+        maxsize=app.config.get("USER_CACHE_SIZE", 10000),
+        ttl=app.config.get("USER_CACHE_TTL", 300)
+    )
+    app.extensions["featured_projects_cache"] = CachedPayload(
+        _build_featured_projects,
+        ttl=app.config.get("FEATURED_PROJECTS_CACHE_TTL", 60)
+    )
+    ideas_local = TTLCache(maxsize=app.config.get("IDEAS_CACHE_SIZE", 512), ttl=app.config.get("IDEAS_CACHE_TTL", 300))
+    if app.config.get("IDEAS_CACHE_REDIS_URL"):
+        app.extensions["ideas_cache"] = VersionedCache.from_url(
+            ideas_local, app.config["IDEAS_CACHE_REDIS_URL"],
+            prefix="project_catalog:ideas:", shared_ttl=app.config.get("IDEAS_CACHE_TTL", 300)
+        )
+    else:
+        app.extensions["ideas_cache"] = VersionedCache(ideas_local)
+    app.register_blueprint(bp)
@@ -0,0 +1,89 @@
+"""Fast JSON encoding for API responses.
+
+``FastJSONProvider`` replaces Flask's default JSON provider. It encodes with
+orjson when that is installed and falls back to the standard library
+otherwise. Either way, UUIDs and datetimes are encoded by the encoder
+itself (as strings and ISO 8601), so model serializers can hand over raw
+column values instead of calling ``str()`` and ``isoformat()`` per field.
+
+Select the encoder with ``JSON_ENCODER``: ``auto`` (default), ``orjson``
+or ``stdlib``.
+"""
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def columns_dict(instance, names):
+    """Return ``{name: value}`` for the mapped columns ``names`` of ``instance``.
+
+    Reads the instance's loaded state directly instead of going through the
+    ORM's instrumented attributes. Falls back to normal attribute access if
+    any of the columns is expired or not loaded.
+    """
+    state = instance.__dict__
+    try:
+        return {name: state[name] for name in names}
+    except KeyError:
+        return {name: getattr(instance, name) for name in names}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that uses orjson when available and never sorts keys."""
+
+    sort_keys = False
+    use_orjson = orjson is not None
+
+    def dumps_bytes(self, obj):
+        """Encode ``obj`` straight to UTF-8 bytes."""
+        if self.use_orjson:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Callers asking for specific options (indent, sort_keys...) get the stdlib encoder
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install ``FastJSONProvider`` on ``app`` according to ``JSON_ENCODER``."""
+    encoder = app.config.get('JSON_ENCODER', 'auto')
+    if encoder not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f"Unknown JSON_ENCODER: {encoder!r}")
+    if encoder == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_ENCODER=orjson requires the 'orjson' package")
+    provider = FastJSONProvider(app)
+    provider.use_orjson = orjson is not None and encoder != 'stdlib'
+    app.json = provider
@@ -0,0 +1,296 @@
+"""Server-side session storage.
+
+Flask's default session keeps everything in a signed cookie. Setting
+``SESSION_BACKEND`` to ``sqlite`` or ``redis`` stores sessions server-side:
+
+- the cookie only carries ``<sid>.<version>``, signed with the app secret;
+- session data is stored as compact tagged JSON (the same encoding Flask
+  uses for cookie sessions) rather than pickles;
+- each worker keeps recently used sessions in an in-process LRU. A cached
+  copy is only used when its version is at least the one in the client's
+  cookie, so a write made by another worker is never hidden by a stale
+  copy. A cookie one or more versions behind the store (a request sent
+  alongside one that rewrote the session) still reads the current data;
+- clearing the session or changing ``user_id`` (login, logout) moves it to
+  a fresh sid and deletes the old one, so a cookie planted before login
+  can't ride along with it and cookies from before a logout read nothing;
+- the shared store is either a SQLite database in WAL mode (one file shared
+  by every worker on the host) or any Redis-protocol server;
+- expired rows are removed by a background sweeper (Redis expires keys itself).
+"""
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from app.cache import TTLCache
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its id, version and whether it changed.
+
+    ``regenerate`` is set when the session is cleared or its ``user_id``
+    changes; it is then saved under a new sid.
+    """
+
+    def __init__(self, initial=None, sid=None, version=0, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.version = version
+        self.new = new
+        self.modified = False
+        self.regenerate = False
+
+    def __setitem__(self, key, value):
+        if key == 'user_id' and self.get('user_id') != value:
+            self.regenerate = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if key == 'user_id':
+            self.regenerate = True
+        super().__delitem__(key)
+
+    def pop(self, key, *default):
+        if key == 'user_id' and key in self:
+            self.regenerate = True
+        return super().pop(key, *default)
+
+    def clear(self):
+        self.regenerate = True
+        super().clear()
+
+
+class SQLiteSessionStore:
+    """Session rows in a SQLite database running in WAL mode.
+
+    WAL lets readers proceed while another worker writes, and
+    ``synchronous=NORMAL`` avoids an fsync on every commit.
+    """
+
+    needs_sweeping = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "sid TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+
+    def _connection(self):
+        # sqlite3 connections must not cross threads or forks
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, sid):
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, data, ttl):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)",
+            (sid, data, time.time() + ttl)
+        )
+
+    def delete(self, sid):
+        self._connection().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def sweep(self):
+        """Delete expired sessions; returns how many were removed."""
+        return self._connection().execute(
+            "DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+
+
+class RedisSessionStore:
+    """Session keys in any Redis-protocol server, expired by the server itself.
+
+    ``client`` only needs ``get``, ``setex`` and ``delete``, so a local
+    stand-in can replace a real server.
+    """
+
+    needs_sweeping = False
+
+    def __init__(self, client, prefix='session:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, prefix='session:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=redis requires the 'redis' package") from e
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    def get(self, sid):
+        return self.client.get(self.prefix + sid)
+
+    def set(self, sid, data, ttl):
+        self.client.setex(self.prefix + sid, max(int(ttl), 1), data)
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+    def sweep(self):
+        return 0
+
+
+class CachedSessionInterface(SessionInterface):
+    """Session interface backed by ``store`` with an in-process LRU in front."""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, cache_size=10000, sweep_interval=300):
+        self.store = store
+        self.cache = TTLCache(maxsize=cache_size, ttl=60)
+        self.sweep_interval = sweep_interval
+        self._sweeper = None
+        self._sweeper_pid = None
+        self._sweeper_lock = threading.Lock()
+
+    def _signer(self, app):
+        if not app.secret_key:
+            return None
+        return Signer(app.secret_key, salt='server-session')
+
+    def _lifetime(self, app):
+        return app.permanent_session_lifetime.total_seconds()
+
+    def open_session(self, app, request):
+        self._ensure_sweeper(app)
+        signer = self._signer(app)
+        if signer is None:
+            return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return ServerSession(sid=secrets.token_urlsafe(24), new=True)
+
+        try:
+            sid, _, version = signer.unsign(cookie).decode().rpartition('.')
+            version = int(version)
+        except (BadSignature, ValueError):
+            return ServerSession(sid=secrets.token_urlsafe(24), new=True)
+
+        cached = self.cache.get(sid)
+        if cached is not None and cached[0] >= version:
+            return ServerSession(dict(cached[1]), sid=sid, version=cached[0])
+
+        raw = self.store.get(sid)
+        if raw is None:
+            return ServerSession(sid=secrets.token_urlsafe(24), new=True)
+        stored = self.serializer.loads(raw.decode() if isinstance(raw, bytes) else raw)
+        self.cache.set(sid, (stored['v'], stored['d']))
+        # Older cookies for a live sid come from concurrent requests; only
+        # login/logout retire a sid, and they delete it from the store
+        if stored['v'] < version:
+            return ServerSession(sid=secrets.token_urlsafe(24), new=True)
+        return ServerSession(stored['d'], sid=sid, version=stored['v'])
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        # The body may depend on who is logged in; shared caches must key on the cookie
+        response.vary.add('Cookie')
+
+        if session.regenerate and not session.new:
+            self.store.delete(session.sid)
+            self.cache.pop(session.sid)
+            session.sid = secrets.token_urlsafe(24)
+            session.version = 0
+            session.new = True
+
+        if not session:
+            if session.modified:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not session.modified:
+            return
+
+        session.version += 1
+        data = dict(session)
+        raw = self.serializer.dumps({'v': session.version, 'd': data})
+        self.store.set(session.sid, raw.encode(), self._lifetime(app))
+        self.cache.set(session.sid, (session.version, data))
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(f"{session.sid}.{session.version}").decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def _ensure_sweeper(self, app):
+        if not self.store.needs_sweeping or self.sweep_interval <= 0:
+            return
+        if self._sweeper is not None and self._sweeper_pid == os.getpid():
+            return
+        with self._sweeper_lock:
+            if self._sweeper is not None and self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+            self._sweeper = threading.Thread(target=self._sweep_forever, args=(app,), name='session-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep_forever(self, app):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                removed = self.store.sweep()
+                if removed:
+                    app.logger.info(f"Session sweeper removed {removed} expired sessions")
+            except Exception as e:
+                app.logger.error(f"Session sweep failed: {e}")
+
+
+def init_sessions(app):
+    """Install the session backend named by ``SESSION_BACKEND``.
+
+    ``cookie`` (the default) keeps Flask's signed-cookie sessions.
+    """
+    backend = app.config.get('SESSION_BACKEND', 'cookie')
+    if backend == 'cookie':
+        return
+    if backend == 'sqlite':
+        store = SQLiteSessionStore(app.config['SESSION_SQLITE_PATH'])
+    elif backend == 'redis':
+        store = RedisSessionStore.from_url(
+            app.config['SESSION_REDIS_URL'],
+            prefix=app.config.get('SESSION_KEY_PREFIX', 'session:')
+        )
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend!r}")
+    app.session_interface = CachedSessionInterface(
+        store,
+        cache_size=app.config.get('SESSION_CACHE_SIZE', 10000),
+        sweep_interval=app.config.get('SESSION_SWEEP_INTERVAL', 300)
+    )
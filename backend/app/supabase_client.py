@@ -0,0 +1,48 @@
+"""Lazily created Supabase client.
+
+Importing ``supabase`` pulls in ``realtime``, ``storage3``, ``postgrest``,
+``supabase_auth`` and ``httpx``, roughly a third of the app's import time.
+Only the auth routes need the client, so ``LazySupabase`` defers both the
+import and ``create_client`` to the first call of ``get()``. The client is
+created per process, so under ``gunicorn --preload`` each worker builds its
+own after the fork instead of inheriting the master's HTTP connections.
+"""
+import os
+import threading
+import warnings
+
+
+class LazySupabase:
+    """Holds the Supabase settings and builds the client on first use."""
+
+    def __init__(self, url, anon_key):
+        self.url = url
+        self.anon_key = anon_key
+        self.configured = bool(
+            url and anon_key and not url.startswith("your_") and not anon_key.startswith("your_")
+        )
+        self._client = None
+        self._pid = None
+        self._failed = False
+        self._lock = threading.Lock()
+        if not self.configured:
+            warnings.warn("SUPABASE_URL or SUPABASE_ANON_KEY missing or using placeholder values in backend/.env — supabase client not created", RuntimeWarning)
+
+    def get(self):
+        """Return the client, creating it on first use; None if it can't be created."""
+        if not self.configured:
+            return None
+        if self._pid == os.getpid() and (self._client is not None or self._failed):
+            return self._client
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._client = None
+                self._failed = False
+                try:
+                    from supabase import create_client
+                    self._client = create_client(self.url, self.anon_key)
+                except Exception as e:
+                    warnings.warn(f"Failed to create Supabase client: {e}", RuntimeWarning)
+                    self._failed = True
+        return self._client
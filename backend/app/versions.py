@@ -0,0 +1,183 @@
+"""Per-collection version counters and conditional GETs.
+
+Each collection (ideas, comments, projects, users) has a Postgres sequence,
+``<name>_version_seq``, that is advanced after every committed change to it.
+Committed session writes are detected automatically: flushed objects plus
+INSERT/UPDATE/DELETE statements run through the session. The like buffer
+bumps the counters itself after each flush.
+
+``@conditional(*collections)`` builds a weak ETag from the current
+versions, the request URL and the logged-in user. It answers a matching
+``If-None-Match`` with 304 before the view runs, so a revalidation costs one
+tiny query instead of the view's queries. With ``COLLECTION_VERSION_CACHE_TTL``
+set, even that query is skipped while the versions are fresh in memory; other
+workers' writes may then take up to that long to show.
+
+The counters are bumped after commit, never before. A reader that races a
+write may pair the old version with the new data. That only causes an
+extra cache miss later, never a stale 304. This holds only for data read
+from the primary: a replica can lag behind the versions, so requests
+served from the replica get no version ETag, and version-keyed caches must
+be filled from the primary (``primary_reads`` in app/replica.py).
+"""
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request, session
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+COLLECTIONS = ('ideas', 'comments', 'projects', 'users')
+
+# Tables whose changes show up in another collection's responses
+TABLE_COLLECTIONS = {
+    'user_idea_likes': 'ideas',
+    'user_project_likes': 'projects',
+}
+
+_CHANGED_KEY = 'changed_collections'
+
+
+def sequence_name(collection):
+    return f"{collection}_version_seq"
+
+
+def collection_for_table(table_name):
+    name = TABLE_COLLECTIONS.get(table_name, table_name)
+    return name if name in COLLECTIONS else None
+
+
+class CollectionVersions:
+    """Per-process view of the collection version counters."""
+
+    def __init__(self):
+        self.app = None
+        self.db = None
+        self.ttl = 0
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._fetched_at = 0.0
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        self.ttl = app.config.get('COLLECTION_VERSION_CACHE_TTL', 0)
+        if not event.contains(Session, 'after_flush', self._on_flush):
+            event.listen(Session, 'after_flush', self._on_flush)
+            event.listen(Session, 'do_orm_execute', self._on_execute)
+            event.listen(Session, 'after_commit', self._on_commit)
+            event.listen(Session, 'after_rollback', self._on_rollback)
+
+    def _record(self, db_session, table_names):
+        changed = db_session.info.setdefault(_CHANGED_KEY, set())
+        for table_name in table_names:
+            collection = collection_for_table(table_name)
+            if collection:
+                changed.add(collection)
+
+    def _on_flush(self, db_session, flush_context):
+        objects = [*db_session.new, *db_session.dirty, *db_session.deleted]
+        self._record(db_session, {obj.__table__.name for obj in objects if hasattr(obj, '__table__')})
+
+    def _on_execute(self, orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = getattr(orm_execute_state.statement, 'table', None)
+            if table is not None:
+                self._record(orm_execute_state.session, {table.name})
+
+    def _on_commit(self, db_session):
+        changed = db_session.info.pop(_CHANGED_KEY, None)
+        if changed:
+            try:
+                self.bump(changed)
+            except Exception as e:
+                self.app.logger.error(f"Failed to bump collection versions {sorted(changed)}: {e}")
+
+    def _on_rollback(self, db_session):
+        db_session.info.pop(_CHANGED_KEY, None)
+
+    def bump(self, collections, conn=None):
+        """Advance the counters of ``collections``; uses ``conn`` if given."""
+        collections = sorted(set(collections))
+        sql = text("SELECT " + ", ".join(f"nextval('{sequence_name(c)}')" for c in collections))
+        if conn is None:
+            with self.db.engine.begin() as own_conn:
+                values = own_conn.execute(sql).one()
+        else:
+            values = conn.execute(sql).one()
+        with self._lock:
+            self._versions.update(zip(collections, values))
+
+    def get(self, collections):
+        """Return ``{collection: version}``, read at most once per request."""
+        versions = g.get('collection_versions') if has_request_context() else None
+        if versions is None:
+            versions = self._current()
+            if has_request_context():
+                g.collection_versions = versions
+        return {c: versions[c] for c in collections}
+
+    def _current(self):
+        """Return all versions, reading the sequences unless they are cached."""
+        if self.ttl > 0 and time.monotonic() - self._fetched_at < self.ttl:
+            versions = self._versions
+            if all(c in versions for c in COLLECTIONS):
+                return dict(versions)
+
+        sql = text("SELECT " + ", ".join(f"(SELECT last_value FROM {sequence_name(c)})" for c in COLLECTIONS))
+        with self.db.engine.connect() as conn:
+            values = conn.execute(sql).one()
+        versions = dict(zip(COLLECTIONS, values))
+        with self._lock:
+            self._versions = dict(versions)
+            self._fetched_at = time.monotonic()
+        return versions
+
+    def etag(self, collections, *parts):
+        """Return a weak-ETag value for ``collections`` and request-specific ``parts``."""
+        versions = self.get(collections)
+        key = "|".join([*(f"{c}={versions[c]}" for c in collections), *(str(p) for p in parts)])
+        return hashlib.sha1(key.encode()).hexdigest()
+
+
+collection_versions = CollectionVersions()
+
+
+def conditional(*collections, anonymous=True):
+    """Serve a GET view with a weak ETag from the versions of ``collections``.
+
+    A matching ``If-None-Match`` gets a 304 before the view runs. Requests
+    routed to the read replica are served without an ETag. With
+    ``anonymous=False`` logged-out requests skip the version lookup, for
+    views that answer them from a cache with its own ETag.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user_id = session.get("user_id")
+            if g.get('use_replica') or not (user_id or anonymous):
+                return f(*args, **kwargs)
+            try:
+                etag = collection_versions.etag(collections, request.full_path, user_id)
+            except Exception as e:
+                current_app.logger.error(f"Collection versions unavailable: {e}")
+                return f(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200 or 'ETag' in response.headers:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.cache_control.no_cache = True
+            if user_id:
+                response.cache_control.private = True
+            else:
+                response.cache_control.public = True
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the API routes: p50/p95/p99 latency and queries per request.
+
+Drives /ideas (paged, filtered, searched, and keyset pages followed
+``--keyset-depth`` pages deep), /home, idea comments and like/unlike
+against the current database, ideally one filled by
+seed_data.py. Target ideas are drawn from the most-liked ideas plus a random
+sample, so hot and cold rows are both exercised; ``--seed`` makes a run
+repeatable.
+
+- in-process (default): requests go through the Flask test client, one at a
+  time; every SQL statement sent to any engine is counted per request.
+- over HTTP (``--url``): ``--concurrency`` threads with keep-alive
+  connections against a running server. Like/unlike needs a logged-in
+  session cookie (``--cookie "session=..."``) and is skipped without one.
+  Queries per request are read from the ``Server-Timing`` header, and show
+  as "-" when the server doesn't send it (``SERVER_TIMING`` off).
+
+Usage:
+    python bench_api.py [--requests 500] [--only ideas_page,home]
+    python bench_api.py --url http://localhost:5000 --concurrency 16 --cookie "session=..."
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:  # then don't ask the server for br
+    brotli = None
+
+# Load environment variables
+load_dotenv()
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import event
+
+from app import create_app
+from app.models import db, Idea, User, UserIdeaLike
+
+SEARCH_TERMS = ("python", "rust compiler", "react dashboard", "game engine", "budget tracker", "chess")
+DIFFICULTIES = ("easy", "medium", "hard")
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Targets:
+    """Ideas and a user to aim the scenarios at, read once from the database."""
+
+    def __init__(self, app, rng, sample=1000):
+        with app.app_context():
+            hot = db.session.scalars(db.select(Idea.id).order_by(Idea.like_count.desc()).limit(sample)).all()
+            cold = db.session.scalars(db.select(Idea.id).order_by(db.func.random()).limit(sample)).all()
+            self.idea_ids = [str(i) for i in dict.fromkeys([*hot, *cold])]
+            if not self.idea_ids:
+                sys.exit("No ideas in the database; run seed_data.py first")
+            self.total_ideas = db.session.scalar(db.select(db.func.count()).select_from(Idea))
+
+            # The user with the fewest likes, so like/unlike rarely hits an already-liked idea
+            likes = db.select(db.func.count()).where(UserIdeaLike.user_id == User.id).scalar_subquery()
+            user = db.session.execute(db.select(User.id, User.auth_id).order_by(likes).limit(1)).first()
+            self.auth_id = str(user.auth_id) if user else None
+            liked = set()
+            if user:
+                liked = {str(i) for i in db.session.scalars(
+                    db.select(UserIdeaLike.idea_id).where(UserIdeaLike.user_id == user.id))}
+            self.likeable_ids = [i for i in self.idea_ids if i not in liked]
+        self.rng = rng
+
+    def idea(self):
+        return self.rng.choice(self.idea_ids)
+
+    def page(self, limit=12):
+        return self.rng.randint(1, max(1, min(self.total_ideas // limit, 50)))
+
+
+def scenarios(targets, keyset_depth=5):
+    """Return {name: function returning the (method, path) steps of one iteration}.
+
+    A step function may be a generator: each ``yield`` receives the previous
+    response's JSON body, so later steps can follow links such as cursors.
+    """
+    rng = targets.rng
+
+    def ideas_keyset():
+        path = "/ideas?cursor=&limit=12"
+        for _ in range(keyset_depth):
+            body = yield ("GET", path)
+            next_cursor = ((body or {}).get("pagination") or {}).get("next_cursor")
+            if not next_cursor:
+                return
+            path = f"/ideas?cursor={next_cursor}&limit=12"
+
+    def like_unlike():
+        idea_id = rng.choice(targets.likeable_ids)
+        return [("POST", f"/ideas/{idea_id}/like"), ("DELETE", f"/ideas/{idea_id}/like")]
+
+    return {
+        "ideas_page": lambda: [("GET", f"/ideas?page={targets.page()}&limit=12")],
+        "ideas_filtered": lambda: [("GET", f"/ideas?difficulty={rng.choice(DIFFICULTIES)}&page={targets.page()}")],
+        "ideas_search": lambda: [("GET", f"/ideas?search={rng.choice(SEARCH_TERMS).replace(' ', '+')}")],
+        "ideas_keyset": ideas_keyset,
+        "home": lambda: [("GET", "/home")],
+        "comments": lambda: [("GET", f"/ideas/{targets.idea()}/comments")],
+        "like_unlike": like_unlike,
+    }
+
+
+class QueryCounter:
+    """Counts statements sent to every engine of the app."""
+
+    def __init__(self, app):
+        with app.app_context():
+            self.engines = list(db.engines.values())
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._on_execute)
+
+
+def run_steps(steps, send):
+    """Send one iteration's steps; returns the samples.
+
+    ``send(method, path)`` returns ``(sample, json_body)``; generator steps
+    get the body back as the value of their ``yield``.
+    """
+    samples = []
+    steps = iter(steps)
+    resume = getattr(steps, "send", None)
+    try:
+        step = next(steps)
+        while True:
+            sample, body = send(*step)
+            samples.append(sample)
+            step = resume(body) if resume else next(steps)
+    except StopIteration:
+        pass
+    return samples
+
+
+def _json(data):
+    try:
+        return json.loads(data) if data else None
+    except ValueError:
+        return None
+
+
+def run_in_process(app, targets, make_requests, n, logged_in):
+    client = app.test_client()
+    if logged_in and targets.auth_id:
+        with client.session_transaction() as sess:
+            sess["user_id"] = targets.auth_id
+
+    samples = []  # (seconds, queries, ok) per request
+    with QueryCounter(app) as counter:
+        def send(method, path):
+            counter.count = 0
+            start = time.perf_counter()
+            response = client.open(path, method=method)
+            elapsed = time.perf_counter() - start
+            return (elapsed, counter.count, response.status_code < 400), _json(response.get_data())
+
+        for _ in range(n):
+            samples.extend(run_steps(make_requests(), send))
+    return samples
+
+
+class HTTPClient:
+    """One keep-alive connection per thread."""
+
+    def __init__(self, url, cookie=None):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.headers = {"Accept-Encoding": "gzip, br" if brotli else "gzip"}
+        if cookie:
+            self.headers["Cookie"] = cookie
+        self.local = threading.local()
+
+    def request(self, method, path):
+        """Return ``((seconds, queries, ok), json_body)``."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = self.connection_class(self.netloc, timeout=30)
+        start = time.perf_counter()
+        data, encoding = b"", None
+        try:
+            conn.request(method, self.prefix + path, headers=self.headers)
+            response = conn.getresponse()
+            data = response.read()
+            encoding = response.getheader("Content-Encoding")
+            ok = response.status < 400
+            match = SERVER_TIMING_QUERIES.search(response.getheader("Server-Timing") or "")
+            queries = int(match.group(1)) if match else None
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self.local.conn = None
+            ok, queries = False, None
+        elapsed = time.perf_counter() - start
+        if encoding == "gzip":
+            data = gzip.decompress(data)
+        elif encoding == "br":
+            data = brotli.decompress(data)
+        return (elapsed, queries, ok), _json(data)
+
+
+def run_over_http(client, make_requests, n, concurrency):
+    def iteration(_):
+        return run_steps(make_requests(), client.request)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return [sample for samples in pool.map(iteration, range(n)) for sample in samples]
+
+
+def summarize(name, samples, wall):
+    latencies = sorted(s[0] * 1000 for s in samples if s[2])
+    queries = [s[1] for s in samples if s[1] is not None]
+    errors = sum(1 for s in samples if not s[2])
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else float("nan")
+    return {
+        "scenario": name,
+        "requests": len(samples),
+        "errors": errors,
+        "rps": len(samples) / wall if wall else 0.0,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "queries_per_request": statistics.mean(queries) if queries else None,
+    }
+
+
+def print_table(rows):
+    print(f"{'scenario':<16}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for r in rows:
+        queries = f"{r['queries_per_request']:.1f}" if r["queries_per_request"] is not None else "-"
+        print(f"{r['scenario']:<16}{r['requests']:>10}{r['errors']:>8}{r['rps']:>9.0f}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{queries:>9}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=300, help="iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed iterations per scenario")
+    parser.add_argument("--only", help="comma-separated scenarios to run")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for target selection")
+    parser.add_argument("--keyset-depth", type=int, default=5, help="ideas_keyset: pages to follow per iteration")
+    parser.add_argument("--anonymous", action="store_true", help="in-process: don't log in for read scenarios")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=8, help="HTTP client threads")
+    parser.add_argument("--cookie", help="Cookie header of a logged-in session, for HTTP like/unlike")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    app = create_app()
+    targets = Targets(app, random.Random(args.seed))
+    selected = scenarios(targets, args.keyset_depth)
+    if args.only:
+        selected = {name: selected[name] for name in args.only.split(",")}
+
+    http_client = HTTPClient(args.url, args.cookie) if args.url else None
+    rows = []
+    for name, make_requests in selected.items():
+        needs_login = name == "like_unlike"
+        if needs_login and (not targets.likeable_ids or (http_client and not args.cookie)
+                            or (not http_client and not targets.auth_id)):
+            print(f"Skipping {name}: no logged-in user or likeable ideas")
+            continue
+        logged_in = needs_login or not args.anonymous
+
+        if http_client:
+            run_over_http(http_client, make_requests, args.warmup, args.concurrency)
+            start = time.perf_counter()
+            samples = run_over_http(http_client, make_requests, args.requests, args.concurrency)
+        else:
+            run_in_process(app, targets, make_requests, args.warmup, logged_in)
+            start = time.perf_counter()
+            samples = run_in_process(app, targets, make_requests, args.requests, logged_in)
+        rows.append(summarize(name, samples, time.perf_counter() - start))
+
+    mode = f"HTTP {args.url}, {args.concurrency} threads" if http_client else "in-process"
+    print(f"{mode}, {args.requests} iterations per scenario, {targets.total_ideas:,} ideas")
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"mode": mode, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark serializing a page of ideas the old way and the new way.
+
+- old: to_dict with str()/isoformat() per field, encoded by Flask's default
+  (stdlib json, sorted keys) provider;
+- new: to_dict from the column tuples with raw UUIDs/datetimes, encoded by
+  FastJSONProvider (orjson when installed, stdlib otherwise).
+
+Uses transient model instances, so no database rows are needed, but the app
+still has to import (SUPABASE_DB_URL must be set).
+
+Usage: python bench_serialization.py [ideas_per_page] [iterations]
+"""
+
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app
+from app.like_buffer import like_buffer
+from app.models import Idea, User
+from app.serialization import FastJSONProvider
+
+app = create_app()
+
+
+def make_ideas(n):
+    author = User(id=uuid.uuid4(), auth_id=uuid.uuid4(), name="Bench Author", email="bench@example.com")
+    now = datetime.now(timezone.utc)
+    return [
+        Idea(
+            id=uuid.uuid4(),
+            title=f"Idea {i}",
+            description="A reasonably long description of an idea " * 4,
+            image_url=None,
+            created_at=now,
+            updated_at=now,
+            like_count=i,
+            status="open",
+            difficulty="Medium",
+            user_id=author.id,
+            user=author,
+            solution=None,
+            project_count=i % 3,
+            comment_count=i % 5,
+        )
+        for i in range(n)
+    ]
+
+
+def legacy_to_dict(idea):
+    """Idea.to_dict as it was before the column-tuple serializers."""
+    return {
+        'id': str(idea.id),
+        'title': idea.title,
+        'description': idea.description,
+        'image_url': idea.image_url,
+        'created_at': idea.created_at.isoformat() if idea.created_at else None,
+        'updated_at': idea.updated_at.isoformat() if idea.updated_at else None,
+        'like_count': like_buffer.like_count(idea),
+        'status': idea.status,
+        'difficulty': idea.difficulty,
+        'user_id': str(idea.user_id),
+        'author': idea.user.name if idea.user else None,
+        'solution': idea.solution,
+        'project_count': idea.project_count,
+        'comment_count': idea.comment_count,
+        'has_projects': idea.has_projects()
+    }
+
+
+def bench(label, to_dict, provider, ideas, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        provider.response({"status": "success", "data": {"ideas": [to_dict(idea) for idea in ideas]}})
+    elapsed = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<34}{elapsed:>12.1f}")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    ideas = make_ideas(n)
+
+    stdlib = FastJSONProvider(app)
+    stdlib.use_orjson = False
+    fast = FastJSONProvider(app)
+
+    with app.app_context():
+        print(f"{n} ideas per page, {iterations} iterations")
+        print(f"{'case':<34}{'us/page':>12}")
+        old = bench("old to_dict + default provider", legacy_to_dict, DefaultJSONProvider(app), ideas, iterations)
+        bench("new to_dict + stdlib encoder", Idea.to_dict, stdlib, ideas, iterations)
+        if fast.use_orjson:
+            new = bench("new to_dict + orjson", Idea.to_dict, fast, ideas, iterations)
+            print(f"speedup: {old / new:.1f}x")
+        else:
+            print("orjson not installed; skipping")
+
+
+if __name__ == "__main__":
+    main()
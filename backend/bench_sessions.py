@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark session backends: a read-only request and a session-writing request.
+
+Compares Flask's cookie sessions, the Flask-Session filesystem backend
+(the old SESSION_TYPE = 'filesystem'), and the SQLite and Redis stores from
+app/sessions.py. Redis is only included when SESSION_REDIS_URL is set.
+
+Usage: python bench_sessions.py [requests_per_case]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from dotenv import load_dotenv
+from flask import Flask, session
+
+# Load environment variables
+load_dotenv()
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from app.sessions import CachedSessionInterface, RedisSessionStore, SQLiteSessionStore
+
+
+def make_app(configure):
+    app = Flask(__name__)
+    app.secret_key = "bench-secret"
+    configure(app)
+
+    @app.route("/read")
+    def read():
+        return {"user_id": session.get("user_id")}
+
+    @app.route("/write")
+    def write():
+        session["user_id"] = "8f14e45f-ceea-467f-a0e6-3c2a8f1b9d10"
+        session["email"] = "someone@example.com"
+        session["hits"] = session.get("hits", 0) + 1
+        return {"hits": session["hits"]}
+
+    return app
+
+
+def backends(workdir):
+    yield "cookie", lambda app: None
+
+    try:
+        from flask_session import Session
+
+        def filesystem(app):
+            app.config["SESSION_TYPE"] = "filesystem"
+            app.config["SESSION_FILE_DIR"] = os.path.join(workdir, "flask_session")
+            Session(app)
+
+        yield "filesystem (Flask-Session)", filesystem
+    except ImportError:
+        print("Flask-Session not installed; skipping filesystem baseline")
+
+    def sqlite(app):
+        app.session_interface = CachedSessionInterface(SQLiteSessionStore(os.path.join(workdir, "sessions.sqlite3")))
+
+    yield "sqlite WAL + LRU", sqlite
+
+    def sqlite_uncached(app):
+        app.session_interface = CachedSessionInterface(SQLiteSessionStore(os.path.join(workdir, "sessions-nolru.sqlite3")))
+        app.session_interface.cache.ttl = 0
+
+    yield "sqlite WAL, no LRU", sqlite_uncached
+
+    redis_url = os.environ.get("SESSION_REDIS_URL")
+    if redis_url:
+        def redis(app):
+            app.session_interface = CachedSessionInterface(RedisSessionStore.from_url(redis_url))
+
+        yield "redis + LRU", redis
+
+
+def bench(app, path, n):
+    client = app.test_client()
+    client.get("/write")  # establish the session cookie
+    start = time.perf_counter()
+    for _ in range(n):
+        client.get(path)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'backend':<28}{'read us/req':>14}{'write us/req':>14}")
+        for name, configure in backends(workdir):
+            app = make_app(configure)
+            read_us = bench(app, "/read", n)
+            write_us = bench(app, "/write", n)
+            print(f"{name:<28}{read_us:>14.1f}{write_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,2 @@
-import os
-
-class Config:
-    SQLALCHEMY_DATABASE_URI = os.environ.get("SUPABASE_DB_URL")
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
\ No newline at end of file
+"""Configuration entry point; the environment profiles live in config_extended.py."""
+from config_extended import Config, DevelopmentConfig, ProductionConfig, TestingConfig, config
@@ -1,19 +1,127 @@
 import os
 
+# Per-worker connection pool profiles. Multiply by the number of gunicorn
+# workers (4 in the Procfile) to get the connections each instance may open.
+DB_POOL_PROFILES = {
+    # Supabase free tier / direct connections: stay well under the connection limit
+    'small': {'pool_size': 2, 'max_overflow': 3},
+    'default': {'pool_size': 5, 'max_overflow': 5},
+    'large': {'pool_size': 10, 'max_overflow': 20},
+}
+
+def database_engine_options():
+    """Build SQLALCHEMY_ENGINE_OPTIONS from DB_POOL_PROFILE and the DB_* overrides."""
+    profile = os.environ.get("DB_POOL_PROFILE", "default")
+    if profile not in DB_POOL_PROFILES:
+        raise ValueError(f"Unknown DB_POOL_PROFILE: {profile!r}")
+    options = {
+        **DB_POOL_PROFILES[profile],
+        'pool_timeout': 10,        # seconds to wait for a free connection before failing
+        'pool_recycle': 1800,      # replace connections before Supabase/poolers drop idle ones
+        'pool_pre_ping': True,     # detect connections killed while idle
+        'pool_use_lifo': True,     # reuse hot connections so surplus ones can idle out
+    }
+    for key, env in (('pool_size', 'DB_POOL_SIZE'), ('max_overflow', 'DB_MAX_OVERFLOW'),
+                     ('pool_timeout', 'DB_POOL_TIMEOUT'), ('pool_recycle', 'DB_POOL_RECYCLE')):
+        if os.environ.get(env):
+            options[key] = int(os.environ[env])
+
+    connect_args = {}
+    timeout_ms = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 15000))
+    if os.environ.get("DB_PGBOUNCER", "false").lower() == "true":
+        # PgBouncer transaction mode: no session state and no server-side
+        # prepared statements. psycopg2 never prepares; psycopg 3 must be told not to.
+        # The statement timeout is set per transaction instead (see app/db_pool.py).
+        if (os.environ.get("SUPABASE_DB_URL") or "").startswith("postgresql+psycopg:"):
+            connect_args['prepare_threshold'] = None
+    elif timeout_ms:
+        connect_args['options'] = f"-c statement_timeout={timeout_ms}"
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+def database_binds():
+    """Build SQLALCHEMY_BINDS; SUPABASE_REPLICA_DB_URL adds a read replica (see app/replica.py)."""
+    url = os.environ.get("SUPABASE_REPLICA_DB_URL")
+    if not url:
+        return {}
+    if url.startswith("sqlite"):
+        return {'replica': url}
+    return {'replica': {'url': url, **database_engine_options()}}
+
 class Config:
     # Database Configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get("SUPABASE_DB_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = database_engine_options()
+    SQLALCHEMY_BINDS = database_binds()
+    # Seconds a client reads from the primary after writing, so it sees its own writes
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 15000))
+    DB_PGBOUNCER = os.environ.get("DB_PGBOUNCER", "false").lower() == "true"
+    
+    # Response caching
+    FEATURED_PROJECTS_CACHE_TTL = int(os.environ.get("FEATURED_PROJECTS_CACHE_TTL", 60))
+
+    # Write-behind like counters: buffer like_count deltas and flush them in batches
+    LIKE_BUFFER_ENABLED = os.environ.get("LIKE_BUFFER_ENABLED", "false").lower() == "true"
+    LIKE_BUFFER_FLUSH_INTERVAL = float(os.environ.get("LIKE_BUFFER_FLUSH_INTERVAL", 0.25))
+
+    # Seconds a user's liked-idea set may be reused for liked_by_me flags (0 = query every page)
+    LIKED_IDS_CACHE_TTL = int(os.environ.get("LIKED_IDS_CACHE_TTL", 0))
+
+    # Verified Supabase access tokens are cached by hash until they expire (capped at this TTL)
+    AUTH_TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", 10000))
+    AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 3600))
+
+    # Logged-in users are cached per worker by auth_id (see login_required)
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 10000))
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 300))
     
     # Flask Configuration
     SECRET_KEY = os.environ.get("FLASK_SECRET_KEY") or "dev-key-change-in-production"
     
-    # Session Configuration
-    SESSION_TYPE = 'filesystem'
+    # Session Configuration (see app/sessions.py)
+    SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cookie")  # cookie (default), or opt in to sqlite (one host) or redis
+    SESSION_SQLITE_PATH = os.environ.get("SESSION_SQLITE_PATH", os.path.join(os.path.dirname(__file__), "instance", "sessions.sqlite3"))
+    SESSION_REDIS_URL = os.environ.get("SESSION_REDIS_URL", "redis://localhost:6379/0")
+    SESSION_CACHE_SIZE = 10000  # sessions kept in each worker's in-process LRU
+    SESSION_SWEEP_INTERVAL = 300  # seconds between expired-session sweeps
     SESSION_PERMANENT = False
-    SESSION_USE_SIGNER = True
     SESSION_KEY_PREFIX = 'project_catalog:'
     
+    # Response compression (see app/compression.py); brotli needs the optional brotli package
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))  # bytes; -1 disables
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+    # Seconds collection versions (ETags) may be reused without a query; 0 = read on every request
+    COLLECTION_VERSION_CACHE_TTL = float(os.environ.get("COLLECTION_VERSION_CACHE_TTL", 0))
+    # approx_total=true: filtered listings count at most this many rows
+    APPROX_COUNT_CAP = int(os.environ.get("APPROX_COUNT_CAP", 1000))
+    # /ideas page cache (see VersionedCache in app/cache.py); TTL 0 disables it.
+    # IDEAS_CACHE_REDIS_URL adds a level shared by all workers (requires the redis package)
+    IDEAS_CACHE_SIZE = int(os.environ.get("IDEAS_CACHE_SIZE", 512))
+    IDEAS_CACHE_TTL = int(os.environ.get("IDEAS_CACHE_TTL", 300))
+    IDEAS_CACHE_REDIS_URL = os.environ.get("IDEAS_CACHE_REDIS_URL")
+    # Per-request SQL instrumentation (see app/query_stats.py)
+    SERVER_TIMING = os.environ.get("SERVER_TIMING", "true").lower() == "true"
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+    SLOW_REQUEST_QUERIES = int(os.environ.get("SLOW_REQUEST_QUERIES", 25))
+    SLOW_REQUEST_DB_MS = float(os.environ.get("SLOW_REQUEST_DB_MS", 500))
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # if set, /metrics requires "Authorization: Bearer <token>"
+    # Directory for the workers' mmap'd metric files (see app/metrics.py); unset = per-worker, in memory
+    METRICS_DIR = os.environ.get("METRICS_DIR")
+    METRICS_REFRESH_INTERVAL = float(os.environ.get("METRICS_REFRESH_INTERVAL", 1.0))  # seconds between pool/cache gauge updates
+    # /health/ready background checks (see app/health.py)
+    HEALTH_CHECK_INTERVAL = float(os.environ.get("HEALTH_CHECK_INTERVAL", 10))  # seconds between checks
+    HEALTH_POOL_SATURATION = float(os.environ.get("HEALTH_POOL_SATURATION", 0.9))  # share of pool in use that fails readiness
+    HEALTH_SUPABASE_TIMEOUT = float(os.environ.get("HEALTH_SUPABASE_TIMEOUT", 2))
+    # EXPLAIN the hot queries at startup and log any that miss their index (see app/index_audit.py)
+    INDEX_AUDIT_ON_STARTUP = os.environ.get("INDEX_AUDIT_ON_STARTUP", "false").lower() == "true"
+    
+    # JSON Configuration (see app/serialization.py)
+    JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto")  # auto, orjson or stdlib
+    
     # Security Headers
     SESSION_COOKIE_SECURE = os.environ.get("FLASK_ENV") == "production"
     SESSION_COOKIE_HTTPONLY = True
@@ -30,6 +138,11 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SESSION_COOKIE_SECURE = False
+    SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL") or os.environ.get("SUPABASE_DB_URL")
+    # Keep test apps independent of each other and of shared state on disk
+    SESSION_BACKEND = 'cookie'
+    LIKE_BUFFER_ENABLED = False
+    FEATURED_PROJECTS_CACHE_TTL = 0
 
 config = {
     'development': DevelopmentConfig,
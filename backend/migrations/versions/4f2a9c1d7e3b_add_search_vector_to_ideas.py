@@ -0,0 +1,40 @@
+"""Add full-text search vector to ideas
+
+Revision ID: 4f2a9c1d7e3b
+Revises: 8c594894a359
+Create Date: 2025-09-20 18:42:11.204517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c1d7e3b'
+down_revision = '8c594894a359'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(solution, '')), 'C')"
+)
+
+
+def upgrade():
+    with op.batch_alter_table('ideas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True
+        ))
+        batch_op.create_index('ix_ideas_search_vector', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('ideas', schema=None) as batch_op:
+        batch_op.drop_index('ix_ideas_search_vector', postgresql_using='gin')
+        batch_op.drop_column('search_vector')
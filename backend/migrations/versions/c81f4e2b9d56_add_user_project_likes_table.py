@@ -0,0 +1,33 @@
+"""Add UserProjectLike table for tracking user likes on projects
+
+Revision ID: c81f4e2b9d56
+Revises: a7d3e5b81c20
+Create Date: 2025-09-22 20:13:48.551092
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f4e2b9d56'
+down_revision = 'a7d3e5b81c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_project_likes',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'project_id', name='unique_user_project_like')
+    )
+
+
+def downgrade():
+    op.drop_table('user_project_likes')
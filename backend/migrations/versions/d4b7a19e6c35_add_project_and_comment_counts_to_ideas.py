@@ -0,0 +1,39 @@
+"""Add denormalized project_count and comment_count to ideas
+
+Revision ID: d4b7a19e6c35
+Revises: c81f4e2b9d56
+Create Date: 2025-09-24 09:31:52.774310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b7a19e6c35'
+down_revision = 'c81f4e2b9d56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ideas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('project_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing rows
+    op.execute("""
+        UPDATE ideas
+        SET project_count = COALESCE(p.n, 0),
+            comment_count = COALESCE(c.n, 0)
+        FROM ideas AS i
+        LEFT JOIN (SELECT idea_id, count(*) AS n FROM projects GROUP BY idea_id) AS p ON p.idea_id = i.id
+        LEFT JOIN (SELECT idea_id, count(*) AS n FROM comments GROUP BY idea_id) AS c ON c.idea_id = i.id
+        WHERE ideas.id = i.id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('ideas', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
+        batch_op.drop_column('project_count')
@@ -0,0 +1,28 @@
+"""Add collection version sequences for ETags
+
+Revision ID: e9c2d58a1f47
+Revises: d4b7a19e6c35
+Create Date: 2025-09-25 14:07:19.512604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9c2d58a1f47'
+down_revision = 'd4b7a19e6c35'
+branch_labels = None
+depends_on = None
+
+COLLECTIONS = ('ideas', 'comments', 'projects', 'users')
+
+
+def upgrade():
+    for name in COLLECTIONS:
+        op.execute(sa.schema.CreateSequence(sa.Sequence(f'{name}_version_seq')))
+
+
+def downgrade():
+    for name in COLLECTIONS:
+        op.execute(sa.schema.DropSequence(sa.Sequence(f'{name}_version_seq')))
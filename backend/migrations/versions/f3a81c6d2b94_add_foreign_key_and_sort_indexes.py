@@ -0,0 +1,47 @@
+"""Add foreign-key and sort indexes
+
+Built with CREATE INDEX CONCURRENTLY so the tables stay writable while the
+indexes build; that can't run inside a transaction, hence the autocommit
+block. Each index commits on its own, so IF NOT EXISTS lets a rerun after a
+partial upgrade skip the ones that are already built.
+
+Revision ID: f3a81c6d2b94
+Revises: e9c2d58a1f47
+Create Date: 2025-09-27 10:42:13.204871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a81c6d2b94'
+down_revision = 'e9c2d58a1f47'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_ideas_user_id', 'ideas', ['user_id']),
+    ('ix_ideas_difficulty_created_at_id', 'ideas', ['difficulty', 'created_at', 'id']),
+    ('ix_comments_user_id', 'comments', ['user_id']),
+    ('ix_projects_user_id', 'projects', ['user_id']),
+    ('ix_projects_idea_id', 'projects', ['idea_id']),
+    ('ix_projects_like_count', 'projects', ['like_count']),
+    ('ix_user_idea_likes_idea_id', 'user_idea_likes', ['idea_id']),
+    ('ix_user_project_likes_project_id', 'user_project_likes', ['project_id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        # Index builds on big tables can outlast DB_STATEMENT_TIMEOUT_MS
+        op.execute("SET statement_timeout = 0")
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Profile worker boot: import time per top-level package, boot time and memory.
+
+Runs ``python -X importtime`` on ``create_app()`` in a fresh interpreter and
+sums the cumulative time of each top-level package, so it's easy to see what
+a gunicorn worker pays for at startup (e.g. whether supabase is imported).
+
+Usage: python profile_imports.py [top_n] [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOT = "import resource; from app import create_app; create_app(); print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+
+def import_times():
+    """Return {top-level package: cumulative import time in ms}.
+
+    A package's time includes dependencies it was the first to import.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    totals = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        # Top-level package entries already include their submodules
+        if "." in name or name.startswith("_"):
+            continue
+        totals[name] = totals.get(name, 0) + int(cumulative) / 1000
+    return totals
+
+
+def boot_stats(runs):
+    times, rss = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", BOOT], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - start)
+        rss.append(int(proc.stdout.strip().splitlines()[-1]))
+    return statistics.median(times), statistics.median(rss)
+
+
+def main():
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    totals = import_times()
+    print(f"{'package':<28}{'import ms':>12}")
+    for package, ms in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top_n]:
+        print(f"{package:<28}{ms:>12.1f}")
+    print(f"supabase imported at boot: {'yes' if 'supabase' in totals else 'no'}")
+
+    boot, rss = boot_stats(runs)
+    print(f"boot (median of {runs}): {boot * 1000:.0f} ms, max RSS {rss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
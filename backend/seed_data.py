@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Bulk-load synthetic users, ideas, projects, comments and likes.
+
+Rows are streamed to Postgres with COPY in batches (``--batch`` rows per
+COPY), never through ``db.session.add``, so millions of rows load in
+minutes. Activity is skewed the way real catalogs are: a few users write
+most ideas and comments, and a few ideas and projects collect most of the
+likes, comments and projects (Zipf weights, exponent ``--skew``).
+
+Afterwards the denormalized counters (like_count, project_count,
+comment_count) are computed from the loaded rows, the tables are ANALYZEd
+and the collection versions are bumped so no cached page survives.
+
+Usage:
+    python seed_data.py --scale 0.01            # ~50k ideas, quick local run
+    python seed_data.py --users 200000 --ideas 1000000 --truncate
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from app import create_app
+from app.models import db
+from app.versions import COLLECTIONS, collection_versions
+
+# Row counts at --scale 1
+FULL_SCALE = {
+    'users': 500_000,
+    'ideas': 5_000_000,
+    'projects': 1_000_000,
+    'comments': 10_000_000,
+    'idea_likes': 20_000_000,
+    'project_likes': 5_000_000,
+}
+
+COLUMNS = {
+    'users': ('id', 'auth_id', 'name', 'github_username', 'email', 'created_at'),
+    # like_count has no server default; load 0 so unliked rows don't sort first as NULL
+    'ideas': ('id', 'title', 'description', 'created_at', 'updated_at', 'status', 'difficulty',
+              'image_url', 'solution', 'user_id', 'like_count'),
+    'projects': ('id', 'title', 'description', 'image_url', 'repo_url', 'live_url', 'tags',
+                 'created_at', 'updated_at', 'user_id', 'idea_id', 'like_count'),
+    'comments': ('id', 'user_id', 'idea_id', 'content', 'created_at', 'updated_at'),
+    'user_idea_likes': ('id', 'user_id', 'idea_id', 'created_at'),
+    'user_project_likes': ('id', 'user_id', 'project_id', 'created_at'),
+}
+
+WORDS = (
+    "python rust go typescript react flask django postgres redis kafka graphql api cli "
+    "dashboard tracker planner scraper compiler chatbot game engine recipe budget fitness "
+    "weather music habit inventory notes calendar markdown search map iot sensor drone "
+    "blockchain wallet portfolio crm blog forum quiz tutor translator chess sudoku"
+).split()
+TAGS = ("python", "javascript", "react", "flask", "rust", "go", "ml", "web", "mobile", "cli")
+STATUSES = ("proposed", "proposed", "proposed", "in_progress", "completed")
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def zipf_cum_weights(n, skew):
+    """Cumulative Zipf weights for ``n`` items, most popular first."""
+    return list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def sentence(rng, n_words):
+    return " ".join(rng.choices(WORDS, k=n_words)).capitalize()
+
+
+class Loader:
+    """Streams generated rows into tables with batched COPY."""
+
+    def __init__(self, conn, batch):
+        self.conn = conn
+        self.batch = batch
+
+    def copy(self, table, rows):
+        """COPY ``rows`` into ``table``; returns the number of rows loaded."""
+        columns = COLUMNS[table]
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        total = 0
+        start = time.perf_counter()
+        while True:
+            chunk = list(itertools.islice(rows, self.batch))
+            if not chunk:
+                break
+            buf = io.StringIO()
+            csv.writer(buf).writerows(chunk)
+            buf.seek(0)
+            with self.conn.cursor() as cur:
+                cur.copy_expert(sql, buf)
+            self.conn.commit()
+            total += len(chunk)
+            print(f"\r{table:<20}{total:>12,} rows", end="", flush=True)
+        elapsed = time.perf_counter() - start
+        print(f"\r{table:<20}{total:>12,} rows in {elapsed:6.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+        return total
+
+
+class Generator:
+    """Generates rows for every table with skewed activity."""
+
+    def __init__(self, counts, skew, days, seed):
+        self.counts = counts
+        self.skew = skew
+        self.rng = random.Random(seed)
+        self.now = datetime.utcnow()
+        self.days = days
+        self.user_ids = []
+        self.idea_ids = []
+        self.project_ids = []
+
+    def uuid(self):
+        """A version-4 UUID drawn from the seeded RNG, so ``--seed`` repeats the ids too."""
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def timestamp(self):
+        return self.now - timedelta(seconds=self.rng.random() * self.days * 86400)
+
+    def pick(self, ids, cum_weights, k=1):
+        return self.rng.choices(ids, cum_weights=cum_weights, k=k)
+
+    def users(self):
+        for i in range(self.counts['users']):
+            user_id = self.uuid()
+            self.user_ids.append(user_id)
+            yield (user_id, self.uuid(), f"User {i}", f"user{i}" if i % 3 else None,
+                   f"user{i}.{user_id.hex[:8]}@example.com", self.timestamp())
+
+    def ideas(self):
+        authors = zipf_cum_weights(len(self.user_ids), self.skew)
+        for _ in range(self.counts['ideas']):
+            idea_id = self.uuid()
+            self.idea_ids.append(idea_id)
+            created = self.timestamp()
+            yield (idea_id, sentence(self.rng, 5), sentence(self.rng, 40), created, created,
+                   self.rng.choice(STATUSES), self.rng.choice(DIFFICULTIES), None,
+                   None if self.rng.random() < 0.8 else "https://example.com/solution",
+                   self.pick(self.user_ids, authors)[0], 0)
+        # Popularity is independent of age: shuffle so hot ideas aren't all old ones
+        self.rng.shuffle(self.idea_ids)
+
+    def projects(self):
+        authors = zipf_cum_weights(len(self.user_ids), self.skew)
+        ideas = zipf_cum_weights(len(self.idea_ids), self.skew)
+        for i in range(self.counts['projects']):
+            project_id = self.uuid()
+            self.project_ids.append(project_id)
+            created = self.timestamp()
+            tags = "{" + ",".join(self.rng.sample(TAGS, self.rng.randint(1, 3))) + "}"
+            yield (project_id, sentence(self.rng, 4), sentence(self.rng, 30), None,
+                   f"https://github.com/example/project-{i}",
+                   f"https://project-{i}.example.com" if i % 2 else None, tags, created, created,
+                   self.pick(self.user_ids, authors)[0], self.pick(self.idea_ids, ideas)[0], 0)
+        self.rng.shuffle(self.project_ids)
+
+    def comments(self):
+        authors = zipf_cum_weights(len(self.user_ids), self.skew)
+        ideas = zipf_cum_weights(len(self.idea_ids), self.skew)
+        for _ in range(self.counts['comments']):
+            created = self.timestamp()
+            yield (self.uuid(), self.pick(self.user_ids, authors)[0], self.pick(self.idea_ids, ideas)[0],
+                   sentence(self.rng, self.rng.randint(5, 30)), created, created)
+
+    def likes(self, target_ids, total):
+        """Likes spread over users, each liking distinct, popularity-weighted targets."""
+        if not target_ids or not self.user_ids:
+            return
+        targets = zipf_cum_weights(len(target_ids), self.skew)
+        # Exponentially distributed activity per user, scaled to ``total``.
+        # Each user is visited once, so a (user, target) pair is never repeated.
+        activity = [self.rng.expovariate(1.0) for _ in self.user_ids]
+        scale = total / sum(activity)
+        for user_id, weight in zip(self.user_ids, activity):
+            want = min(len(target_ids), round(weight * scale))
+            liked = set()
+            # Popular targets get picked repeatedly; top up a few times
+            for _ in range(4):
+                if len(liked) >= want:
+                    break
+                liked.update(self.pick(target_ids, targets, k=want - len(liked)))
+            for target_id in liked:
+                yield (self.uuid(), user_id, target_id, self.timestamp())
+
+
+def update_counters(conn):
+    """Set the denormalized counters from the loaded rows."""
+    statements = [
+        """UPDATE ideas SET like_count = l.n FROM
+           (SELECT idea_id, count(*) AS n FROM user_idea_likes GROUP BY idea_id) l
+           WHERE ideas.id = l.idea_id""",
+        """UPDATE ideas SET project_count = p.n FROM
+           (SELECT idea_id, count(*) AS n FROM projects GROUP BY idea_id) p
+           WHERE ideas.id = p.idea_id""",
+        """UPDATE ideas SET comment_count = c.n FROM
+           (SELECT idea_id, count(*) AS n FROM comments GROUP BY idea_id) c
+           WHERE ideas.id = c.idea_id""",
+        """UPDATE projects SET like_count = l.n FROM
+           (SELECT project_id, count(*) AS n FROM user_project_likes GROUP BY project_id) l
+           WHERE projects.id = l.project_id""",
+    ]
+    with conn.cursor() as cur:
+        cur.execute("SET statement_timeout = 0")
+        for sql in statements:
+            cur.execute(sql)
+    conn.commit()
+
+
+def analyze(conn):
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        for table in COLUMNS:
+            cur.execute(f"ANALYZE {table}")
+    conn.autocommit = False
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, default=0.01, help="fraction of the full-scale row counts")
+    for name in FULL_SCALE:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"override the number of {name}")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent; 0 = uniform activity")
+    parser.add_argument("--days", type=int, default=730, help="spread created_at over this many days")
+    parser.add_argument("--batch", type=int, default=50_000, help="rows per COPY")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, for repeatable datasets")
+    parser.add_argument("--truncate", action="store_true", help="empty the tables first")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    counts = {name: getattr(args, name) if getattr(args, name) is not None else int(full * args.scale)
+              for name, full in FULL_SCALE.items()}
+    counts['users'] = max(counts['users'], 1)
+    print("Loading " + ", ".join(f"{n:,} {name}" for name, n in counts.items()))
+
+    app = create_app()
+    with app.app_context():
+        conn = db.engine.raw_connection()
+        try:
+            if args.truncate:
+                with conn.cursor() as cur:
+                    cur.execute(f"TRUNCATE {', '.join(COLUMNS)} CASCADE")
+                conn.commit()
+
+            gen = Generator(counts, args.skew, args.days, args.seed)
+            loader = Loader(conn, args.batch)
+            start = time.perf_counter()
+            loader.copy('users', gen.users())
+            loader.copy('ideas', gen.ideas())
+            loader.copy('projects', gen.projects())
+            loader.copy('comments', gen.comments())
+            loader.copy('user_idea_likes', gen.likes(gen.idea_ids, counts['idea_likes']))
+            loader.copy('user_project_likes', gen.likes(gen.project_ids, counts['project_likes']))
+
+            print("Updating counters and statistics...")
+            update_counters(conn)
+            analyze(conn)
+        finally:
+            conn.close()
+        collection_versions.bump(COLLECTIONS)
+        print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
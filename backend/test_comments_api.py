@@ -15,9 +15,11 @@ load_dotenv()
 # Add the backend directory to the path
 sys.path.append(os.path.dirname(__file__))
 
-from app import app
+from app import create_app
 from app.models import db, Idea
 
+app = create_app()
+
 def test_comments_api():
     """Test the comments API endpoints."""
     
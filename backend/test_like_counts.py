@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test that liking an idea or project doesn't change its updated_at.
+"""
+
+import os
+import sys
+import uuid
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from app import create_app
+from app.models import db, Idea, Project, User
+
+app = create_app()
+
+def test_like_keeps_updated_at():
+    """like_count changes are not edits, so updated_at must stay as it was."""
+
+    with app.app_context():
+        try:
+            user = User(auth_id=uuid.uuid4(), email=f"{uuid.uuid4()}@example.com", name="Like test")
+            db.session.add(user)
+            db.session.flush()
+            idea = Idea(title="Like test", description="-", user_id=user.id, like_count=0)
+            db.session.add(idea)
+            db.session.flush()
+            project = Project(title="Like test", description="-", repo_url="-", user_id=user.id,
+                              idea_id=idea.id, like_count=0)
+            db.session.add(project)
+            db.session.flush()
+
+            for model, row in ((Idea, idea), (Project, project)):
+                before = db.session.scalar(db.select(model.updated_at).where(model.id == row.id))
+                assert row.increase_like(commit=False) == 1
+                assert row.decrease_like(commit=False) == 0
+                after = db.session.scalar(db.select(model.updated_at).where(model.id == row.id))
+                assert after == before, (model.__name__, before, after)
+                print(f"✅ {model.__name__} like left updated_at unchanged")
+        finally:
+            db.session.rollback()
+
+if __name__ == "__main__":
+    test_like_keeps_updated_at()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test that reconcile-counts keeps project like counts that have no like rows.
+"""
+
+import os
+import sys
+import uuid
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(__file__))
+
+from app import create_app
+from app.models import db, Idea, Project, User, UserProjectLike
+
+app = create_app()
+
+def test_reconcile_keeps_counts_without_like_rows():
+    """A like_count from before user_project_likes existed must survive reconciliation."""
+
+    with app.app_context():
+        try:
+            user = User(auth_id=uuid.uuid4(), email=f"{uuid.uuid4()}@example.com", name="Reconcile test")
+            db.session.add(user)
+            db.session.flush()
+            idea = Idea(title="Reconcile test", description="-", user_id=user.id)
+            db.session.add(idea)
+            db.session.flush()
+            legacy = Project(title="legacy", description="-", repo_url="-", user_id=user.id,
+                             idea_id=idea.id, like_count=5)
+            drifted = Project(title="drifted", description="-", repo_url="-", user_id=user.id,
+                              idea_id=idea.id, like_count=7)
+            db.session.add_all([legacy, drifted])
+            db.session.flush()
+            db.session.add(UserProjectLike(user_id=user.id, project_id=drifted.id))
+            db.session.flush()
+
+            Project.reconcile_counts()
+            counts = dict(db.session.execute(
+                db.select(Project.id, Project.like_count).where(Project.id.in_([legacy.id, drifted.id]))
+            ).all())
+            assert counts[legacy.id] == 5, counts[legacy.id]
+            assert counts[drifted.id] == 1, counts[drifted.id]
+            print("✅ Legacy like_count kept, drifted like_count recounted")
+        finally:
+            db.session.rollback()
+
+if __name__ == "__main__":
+    test_reconcile_keeps_counts_without_like_rows()
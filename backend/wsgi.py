@@ -9,7 +9,9 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from app import app
+from app import create_app
+
+app = create_app()
 
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))